@@ -4,11 +4,14 @@ Daily Chess Offline (DCO) - Main Application Entry Point
 A desktop application for chess training and improvement based on your own past mistakes.
 """
 
+import multiprocessing
 import sys
 from pathlib import Path
 
-from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtCore import Qt, QSharedMemory
+from PySide6.QtWidgets import QApplication, QMessageBox, QSplashScreen
+from PySide6.QtCore import Qt, QThread, QTimer, Signal
+from PySide6.QtGui import QColor, QPixmap
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
 
 from dco.ui.main_window import MainWindow
 from dco.ui.modern_stylesheet import load_stylesheet
@@ -16,6 +19,50 @@ from dco.data.db import init_database
 from dco.core.settings import get_settings
 
 
+SINGLE_INSTANCE_KEY = "DCO_SingleInstance"
+
+
+class DatabaseInitWorker(QThread):
+    """Worker thread that opens the database off the GUI thread."""
+    
+    db_ready = Signal()
+    failed = Signal(str)  # error message
+    
+    def run(self):
+        """Initialize the database in a background thread."""
+        try:
+            init_database()
+            self.db_ready.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+def _notify_running_instance() -> bool:
+    """
+    Ask an already running instance to bring its window to the front.
+    
+    Returns:
+        True if another instance is listening, False otherwise
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(SINGLE_INSTANCE_KEY)
+    if not socket.waitForConnected(500):
+        return False
+    socket.write(b"raise")
+    socket.waitForBytesWritten(500)
+    socket.disconnectFromServer()
+    return True
+
+
+def _raise_window(server: QLocalServer, window: MainWindow):
+    """Raise the main window when a second instance connects."""
+    while server.hasPendingConnections():
+        server.nextPendingConnection().deleteLater()
+    window.showNormal()
+    window.raise_()
+    window.activateWindow()
+
+
 def main():
     """Main application entry point."""
     # Create Qt application
@@ -24,8 +71,18 @@ def main():
     app.setOrganizationName("DCO")
     
     # Check for existing instance
-    shared_memory = QSharedMemory("DCO_SingleInstance")
-    if not shared_memory.create(1):
+    already_running = _notify_running_instance()
+    
+    if not already_running:
+        # Nobody answered, so any leftover socket is from a crashed instance
+        QLocalServer.removeServer(SINGLE_INSTANCE_KEY)
+        instance_server = QLocalServer()
+        if not instance_server.listen(SINGLE_INSTANCE_KEY):
+            # Another instance may have claimed the key since we checked
+            print(f"Could not listen for other instances: {instance_server.errorString()}")
+            already_running = True
+    
+    if already_running:
         QMessageBox.warning(
             None,
             "Application Already Running",
@@ -38,24 +95,55 @@ def main():
     theme = settings.get_theme()
     app.setStyleSheet(load_stylesheet(theme))
     
-    # Initialize database
-    try:
-        db = init_database()
+    # Paint a splash screen while the database opens in the background
+    splash_pixmap = QPixmap(420, 160)
+    splash_pixmap.fill(QColor("#ffffff" if theme != "dark" else "#1e293b"))
+    splash = QSplashScreen(splash_pixmap)
+    splash.showMessage(
+        "Loading Daily Chess Offline...",
+        Qt.AlignCenter,
+        QColor("#1e293b" if theme != "dark" else "#e2e8f0")
+    )
+    splash.show()
+    
+    # Screens query the database as they are built, so the main window is
+    # only created once the database is ready
+    windows = []
+    
+    def on_db_ready():
         print("Database initialized successfully")
-    except Exception as e:
-        print(f"Error initializing database: {e}")
-        return 1
+        
+        # Create and show main window
+        window = MainWindow(theme=theme)
+        windows.append(window)
+        window.show()
+        splash.finish(window)
+        instance_server.newConnection.connect(lambda: _raise_window(instance_server, window))
+        
+        # Warm the other theme's stylesheet once the first frame is painted
+        other_theme = "light" if theme == "dark" else "dark"
+        QTimer.singleShot(0, lambda: load_stylesheet(other_theme))
+        
+        # Ensure cleanup on quit
+        app.aboutToQuit.connect(window._cleanup_all_resources)
     
-    # Create and show main window
-    window = MainWindow()
-    window.show()
+    def on_db_failed(error: str):
+        print(f"Error initializing database: {error}")
+        splash.hide()
+        QMessageBox.critical(None, "Database Error", f"Could not open the database:\n\n{error}")
+        app.exit(1)
     
-    # Ensure cleanup on quit
-    app.aboutToQuit.connect(window._cleanup_all_resources)
+    # Initialize database
+    db_worker = DatabaseInitWorker()
+    db_worker.db_ready.connect(on_db_ready, Qt.QueuedConnection)
+    db_worker.failed.connect(on_db_failed, Qt.QueuedConnection)
+    db_worker.start()
     
     # Run application
     return app.exec()
 
 
 if __name__ == "__main__":
+    # Lets batch analysis worker processes start in the frozen executable
+    multiprocessing.freeze_support()
     sys.exit(main())
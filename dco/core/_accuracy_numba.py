@@ -0,0 +1,54 @@
+"""
+Optional Numba kernel for accuracy computation.
+
+When numba is not installed ``accuracy_kernel`` is None and callers use
+the NumPy implementation in accuracy.py instead.
+"""
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional dependency
+    njit = None
+
+
+NUMBA_AVAILABLE = njit is not None
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def accuracy_kernel(eval_before, eval_after, is_white, has_evals, score_lut):
+        """
+        Average score and centipawn loss over non-book moves in one pass.
+
+        Args:
+            eval_before: int32 evals before each move (White's perspective)
+            eval_after: int32 evals after each move (White's perspective)
+            is_white: Whether White made each move
+            has_evals: Whether both evals of each move are known
+            score_lut: Score for every integer centipawn loss
+
+        Returns:
+            Tuple of (mean score, mean centipawn loss)
+        """
+        n = eval_before.shape[0]
+        last = score_lut.shape[0] - 1
+        score_total = 0.0
+        loss_total = 0.0
+
+        for i in range(n):
+            loss = 0
+            if has_evals[i]:
+                if is_white[i]:
+                    loss = eval_before[i] - eval_after[i]
+                else:
+                    loss = eval_after[i] - eval_before[i]
+                if loss < 0:
+                    loss = 0
+            loss_total += loss
+            score_total += score_lut[min(loss, last)]
+
+        return score_total / n, loss_total / n
+
+else:
+    accuracy_kernel = None
@@ -3,12 +3,28 @@ Accuracy computation for DCO.
 Calculates move accuracy based on centipawn loss.
 """
 
-from typing import List, Optional
-import math
+from typing import List, Optional, Tuple
 
+import numpy as np
+
+from ._accuracy_numba import accuracy_kernel
 from .classification import MoveClassification
 
 
+# Tuning constant for the logarithmic decay (100 cp loss ≈ 80 score)
+SCORE_DECAY_K = 28.85
+
+# Precomputed score for every integer CP loss. The curve reaches 0 well
+# before the last entry, so larger losses are clamped to it exactly.
+_SCORE_LUT_SIZE = 4096
+_SCORE_LUT = np.clip(
+    100.0 - SCORE_DECAY_K * np.log10(1.0 + np.arange(_SCORE_LUT_SIZE)), 0.0, 100.0
+)
+
+# Stable integer code per classification, used for vectorized counting
+_CLASSIFICATION_CODES = {c: i for i, c in enumerate(MoveClassification)}
+
+
 def compute_accuracy(moves: List) -> float:
     """
     Compute accuracy percentage for a list of moves.
@@ -24,59 +40,100 @@ def compute_accuracy(moves: List) -> float:
     if not moves:
         return 0.0
     
-    # Filter out book moves (they don't count toward accuracy)
-    non_book_moves = [m for m in moves if not m.is_book]
+    stats = _accuracy_stats(moves)
     
-    if not non_book_moves:
+    if stats is None:
         return 100.0  # All moves were book moves
     
-    total_score = 0.0
+    # Mean of the 0-100 score of every non-book move
+    accuracy, _ = stats
+    
+    return round(accuracy, 2)
+
+
+def _accuracy_stats(moves: List) -> Optional[Tuple[float, float]]:
+    """
+    Compute mean score and mean centipawn loss over non-book moves.
+    
+    Uses the Numba kernel when numba is installed, NumPy otherwise.
     
-    for move in non_book_moves:
-        # Calculate centipawn loss
-        cp_loss = _get_cp_loss(move)
+    Args:
+        moves: List of MoveAnalysis objects
         
-        # Map to 0-100 score using decay function
-        move_score = _cp_loss_to_score(cp_loss)
-        total_score += move_score
+    Returns:
+        Tuple of (mean score, mean centipawn loss), or None if every
+        move is a book move
+    """
+    arrays = _eval_arrays(moves)
     
-    # Average across all non-book moves
-    accuracy = total_score / len(non_book_moves)
+    if arrays[0].size == 0:
+        return None
     
-    return round(accuracy, 2)
+    if accuracy_kernel is not None:
+        score, loss = accuracy_kernel(*arrays, _SCORE_LUT)
+        return float(score), float(loss)
+    
+    cp_losses = _cp_losses_from_arrays(*arrays)
+    return float(_cp_loss_to_score(cp_losses).mean()), float(cp_losses.mean())
 
 
-def _get_cp_loss(move) -> int:
+def _eval_arrays(moves: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
-    Get centipawn loss for a move.
+    Gather the evaluations of every non-book move into typed arrays.
     
     Args:
-        move: MoveAnalysis object
+        moves: List of MoveAnalysis objects
         
     Returns:
-        Centipawn loss (always non-negative)
+        Tuple of (eval_before, eval_after, is_white, has_evals) arrays;
+        missing evaluations are stored as 0 with has_evals False
     """
-    # Handle None values
-    if move.eval_before_cp is None or move.eval_after_cp is None:
-        return 0
+    # Book moves don't count toward accuracy or ACPL
+    non_book_moves = [m for m in moves if not m.is_book]
+    n = len(non_book_moves)
     
-    # Determine which player made the move (even ply = White, odd ply = Black)
-    is_white = (move.ply_index % 2 == 0)
+    has_evals = np.fromiter(
+        (m.eval_before_cp is not None and m.eval_after_cp is not None for m in non_book_moves),
+        dtype=bool, count=n
+    )
     
     # Both evals are from White's perspective
-    eval_before = move.eval_before_cp
-    eval_after = move.eval_after_cp
+    eval_before = np.fromiter(
+        (m.eval_before_cp or 0 for m in non_book_moves), dtype=np.int32, count=n
+    )
+    eval_after = np.fromiter(
+        (m.eval_after_cp or 0 for m in non_book_moves), dtype=np.int32, count=n
+    )
+    
+    # Even ply = White, odd ply = Black
+    is_white = np.fromiter(
+        (m.ply_index % 2 == 0 for m in non_book_moves), dtype=bool, count=n
+    )
+    
+    return eval_before, eval_after, is_white, has_evals
+
+
+def _cp_losses_from_arrays(
+    eval_before: np.ndarray,
+    eval_after: np.ndarray,
+    is_white: np.ndarray,
+    has_evals: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute centipawn losses from the arrays built by _eval_arrays.
     
+    Returns:
+        Array of centipawn losses (always non-negative); moves with
+        missing evaluations contribute a loss of 0
+    """
     # Calculate loss from moving player's perspective
-    if is_white:
-        loss = eval_before - eval_after
-    else:
-        loss = eval_after - eval_before
+    loss = np.where(is_white, eval_before - eval_after, eval_after - eval_before)
+    loss = np.where(has_evals, loss, 0)
     
-    return max(0, loss)
+    return loss.clip(min=0)
 
 
-def _cp_loss_to_score(cp_loss: int) -> float:
+def _cp_loss_to_score(cp_loss):
     """
     Map centipawn loss to a score from 0-100.
     
@@ -89,22 +146,16 @@ def _cp_loss_to_score(cp_loss: int) -> float:
     - 1000+ cp loss = ~20 score
     
     Args:
-        cp_loss: Centipawn loss (non-negative)
+        cp_loss: Centipawn loss (non-negative), scalar or array
         
     Returns:
-        Score from 0-100
+        Score from 0-100 (same shape as the input)
     """
-    if cp_loss <= 0:
-        return 100.0
-    
-    # Use logarithmic decay: score = 100 - k * log(1 + cp_loss)
-    # Tuned so that 100 cp loss ≈ 80 score
-    k = 28.85  # Tuning constant
-    
-    score = 100.0 - k * math.log10(1 + cp_loss)
-    
-    # Clamp to [0, 100]
-    return max(0.0, min(100.0, score))
+    # Scores follow score = 100 - k * log(1 + cp_loss), clamped to [0, 100],
+    # and are looked up from the precomputed table
+    if isinstance(cp_loss, np.ndarray):
+        return _SCORE_LUT[np.clip(cp_loss, 0, _SCORE_LUT_SIZE - 1)]
+    return float(_SCORE_LUT[min(max(int(cp_loss), 0), _SCORE_LUT_SIZE - 1)])
 
 
 def compute_average_cp_loss(moves: List) -> float:
@@ -120,13 +171,14 @@ def compute_average_cp_loss(moves: List) -> float:
     if not moves:
         return 0.0
     
-    non_book_moves = [m for m in moves if not m.is_book]
+    stats = _accuracy_stats(moves)
     
-    if not non_book_moves:
+    if stats is None:
         return 0.0
     
-    total_loss = sum(_get_cp_loss(m) for m in non_book_moves)
-    return total_loss / len(non_book_moves)
+    _, average_cp_loss = stats
+    
+    return average_cp_loss
 
 
 def count_move_types(moves: List) -> dict:
@@ -139,21 +191,9 @@ def count_move_types(moves: List) -> dict:
     Returns:
         Dictionary mapping classification to count
     """
-    counts = {
-        MoveClassification.BOOK: 0,
-        MoveClassification.BEST: 0,
-        MoveClassification.EXCELLENT: 0,
-        MoveClassification.GOOD: 0,
-        MoveClassification.INACCURACY: 0,
-        MoveClassification.MISTAKE: 0,
-        MoveClassification.BLUNDER: 0,
-        MoveClassification.CRITICAL: 0,
-        MoveClassification.BRILLIANT: 0,
-    }
-    
-    for move in moves:
-        classification = move.classification
-        if classification in counts:
-            counts[classification] += 1
-    
-    return counts
+    codes = [_CLASSIFICATION_CODES.get(m.classification) for m in moves]
+    codes = np.fromiter((c for c in codes if c is not None), dtype=np.intp)
+    
+    tally = np.bincount(codes, minlength=len(_CLASSIFICATION_CODES))
+    
+    return {c: int(tally[i]) for c, i in _CLASSIFICATION_CODES.items()}
@@ -3,25 +3,35 @@ Game analysis functionality for DCO.
 Analyzes games move-by-move and classifies moves.
 """
 
-from typing import List, Optional, Tuple
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from functools import partial
 import chess
 import chess.pgn
+import chess.polyglot
 import io
-
-from .engine import ChessEngine, EngineConfig, EngineEvaluation
-from .classification import classify_move, MoveClassification
-from .accuracy import compute_accuracy
+import logging
+import multiprocessing
+import os
+from sqlalchemy import delete, insert
+
+from .engine import ChessEngine, EngineAnalysisError, EngineConfig, EngineEvaluation
+from .classification import CRITICAL_MULTIPV, classify_move, is_forced, MoveClassification
+from .accuracy import compute_accuracy, count_move_types
 from .eco import get_eco_detector
 from ..data.models import Game, Analysis, Move, GameAnalytics, GameSource
 
 
+logger = logging.getLogger(__name__)
+
+
 # Default phase boundaries (ply is 1-based for readability)
 OPENING_END_PLY = 12
 MIDDLEGAME_END_PLY = 60
 
 
-@dataclass
+@dataclass(slots=True)
 class MoveAnalysis:
     """Analysis result for a single move."""
     ply_index: int
@@ -38,9 +48,10 @@ class MoveAnalysis:
     is_critical: bool
     is_brilliant: bool
     comment: Optional[str] = None
+    cpl: Optional[int] = None  # Centipawn loss for the mover; None without evals
 
 
-@dataclass
+@dataclass(slots=True)
 class GameAnalysisResult:
     """Complete analysis of a game."""
     moves: List[MoveAnalysis]
@@ -54,22 +65,187 @@ class GameAnalysisResult:
     eco_code: Optional[str] = None
     opening_name: Optional[str] = None
     opening_variation: Optional[str] = None
-    eco_code: Optional[str] = None
-    opening_name: Optional[str] = None
-    opening_variation: Optional[str] = None
+
+
+# Default number of position evaluations a GameAnalyzer keeps across games
+EVAL_CACHE_SIZE = 20000
+
+# Halfmove clock from which the fifty-move rule can decide an engine search,
+# making the score depend on the moves before the position
+FIFTY_MOVE_HISTORY_CLOCK = 60
+
+# Polyglot opening book used to recognise book moves when it exists,
+# relative to the working directory like the database
+BOOK_PATH = os.path.join("data", "book.bin")
+
+# Placeholder evaluation for positions the engine is not asked about
+_BOOK_EVALUATION = EngineEvaluation(
+    score_cp=None, score_mate=None, best_move=None, pv_lines=[], depth=0
+)
+
+
+class _MainlineBoardBuilder(chess.pgn.BoardBuilder):
+    """
+    PGN visitor that replays only the mainline onto a board.
+    
+    Skips building the game node tree, comments and variations. Like the
+    default game builder, a bad move is logged and ends the mainline
+    rather than aborting the parse.
+    """
+    
+    def handle_error(self, error: Exception) -> None:
+        logger.error("%s while parsing PGN", error)
+
+
+def read_mainline(pgn: io.TextIOBase) -> Optional[chess.Board]:
+    """
+    Read the next game from a PGN stream as its final mainline position.
+    
+    Args:
+        pgn: Text stream positioned at the start of a game
+        
+    Returns:
+        Board after the last mainline move, with the mainline on its move
+        stack, or None at the end of the stream
+    """
+    return chess.pgn.read_game(pgn, Visitor=_MainlineBoardBuilder)
+
+
+def _mainline_positions(
+    root: chess.Board,
+    moves: List[chess.Move],
+    position_indices: Iterable[int]
+) -> Iterator[chess.Board]:
+    """
+    Yield the game position at each index; index i is the position before ply i.
+    
+    Indices must be ascending and at most len(moves). One board is pushed
+    in place, so every yielded board carries the game history but must be
+    used before the next one is requested.
+    """
+    board = root.copy()
+    for position_index in position_indices:
+        while len(board.move_stack) < position_index:
+            board.push(moves[len(board.move_stack)])
+        yield board
+
+
+_ZOBRIST_HASHER = chess.polyglot.ZobristHasher(chess.polyglot.POLYGLOT_RANDOM_ARRAY)
+
+# Entry of the Polyglot array that flips with the side to move
+_ZOBRIST_TURN = chess.polyglot.POLYGLOT_RANDOM_ARRAY[780]
+
+
+def _zobrist_after(before: chess.Board, after: chess.Board, key_before: int) -> int:
+    """
+    Return the Zobrist hash of after, given before one move earlier and its hash.
+    
+    Only the pieces, castling rights and en passant squares that differ
+    between the two boards are hashed, instead of the whole position.
+    """
+    array = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+    key = key_before ^ _ZOBRIST_TURN
+    
+    if before.castling_rights != after.castling_rights:
+        key ^= _ZOBRIST_HASHER.hash_castling(before) ^ _ZOBRIST_HASHER.hash_castling(after)
+    if before.ep_square is not None:
+        key ^= _ZOBRIST_HASHER.hash_ep_square(before)
+    if after.ep_square is not None:
+        key ^= _ZOBRIST_HASHER.hash_ep_square(after)
+    
+    white_before = before.occupied_co[chess.WHITE]
+    white_after = after.occupied_co[chess.WHITE]
+    for piece_type, mask_before, mask_after in (
+        (chess.PAWN, before.pawns, after.pawns),
+        (chess.KNIGHT, before.knights, after.knights),
+        (chess.BISHOP, before.bishops, after.bishops),
+        (chess.ROOK, before.rooks, after.rooks),
+        (chess.QUEEN, before.queens, after.queens),
+        (chess.KING, before.kings, after.kings),
+    ):
+        if mask_before == mask_after and mask_before & white_before == mask_after & white_after:
+            continue
+        for color, pieces_before, pieces_after in (
+            (chess.WHITE, mask_before & white_before, mask_after & white_after),
+            (chess.BLACK, mask_before & ~white_before, mask_after & ~white_after),
+        ):
+            offset = 64 * ((piece_type - 1) * 2 + color)
+            for square in chess.scan_forward(pieces_before ^ pieces_after):
+                key ^= array[offset + square]
+    
+    return key
+
+
+def _history_dependent(positions: List[chess.Board], position_keys: List[int]) -> List[bool]:
+    """
+    Flag the game positions whose engine score depends on the moves before them.
+    
+    The engine scores a line as drawn when it returns to a position that
+    has already occurred twice, and when the fifty-move rule runs out; the
+    Zobrist hash sees neither. So from the first repetition since the last
+    capture or pawn move, and from FIFTY_MOVE_HISTORY_CLOCK on, a position
+    cannot stand in for another with the same hash.
+    
+    Args:
+        positions: Game positions; position i is the position before ply i
+        position_keys: Zobrist hash of each position
+        
+    Returns:
+        Whether each position depends on its history
+    """
+    flags = []
+    seen = set()
+    repeated = False
+    for position, key in zip(positions, position_keys):
+        if position.halfmove_clock == 0:
+            seen = set()
+            repeated = False
+        repeated = repeated or key in seen
+        seen.add(key)
+        flags.append(repeated or position.halfmove_clock >= FIFTY_MOVE_HISTORY_CLOCK)
+    return flags
+
+
+def _key_after(board: chess.Board, key: int, move: chess.Move) -> int:
+    """Return the Zobrist hash of the position after move; board has hash key."""
+    after = board.copy(stack=False)
+    after.push(move)
+    return _zobrist_after(board, after, key)
 
 
 class GameAnalyzer:
     """Analyzes chess games move-by-move."""
     
-    def __init__(self, engine: ChessEngine):
+    def __init__(
+        self,
+        engine: ChessEngine,
+        eval_cache_size: int = EVAL_CACHE_SIZE,
+        book_path: Optional[str] = BOOK_PATH
+    ):
         """
         Initialize game analyzer.
         
         Args:
             engine: Chess engine instance
+            eval_cache_size: Number of position evaluations kept for reuse
+                across games (0 = evaluate every game from scratch). Reused
+                evaluations were searched in another game, so with a cache
+                a game's result can depend on the games analysed before it.
+            book_path: Polyglot opening book; ignored if the file does not
+                exist (None = no book)
         """
         self.engine = engine
+        self.eval_cache_size = eval_cache_size
+        
+        # The book is opened for each lookup rather than held open, so no
+        # file handle or mapping outlives the lookup (or locks the file)
+        self._book_path: Optional[str] = None
+        if book_path and os.path.exists(book_path):
+            self._book_path = book_path
+        
+        # (Zobrist hash, depth, time per move, MultiPV) -> evaluation,
+        # least recently used first
+        self._eval_cache: "OrderedDict[tuple, EngineEvaluation]" = OrderedDict()
     
     def analyze_game(
         self,
@@ -86,55 +262,156 @@ class GameAnalyzer:
             depth: Analysis depth (None = use engine default)
             time_per_move: Time per move in seconds (None = use engine default)
             opening_book_plies: Number of plies to consider as book moves
+                when the analyzer has no opening book
             
         Returns:
             GameAnalysisResult with move-by-move analysis
         """
         # Parse PGN
-        pgn = io.StringIO(game.pgn_text)
-        chess_game = chess.pgn.read_game(pgn)
+        final_board = read_mainline(io.StringIO(game.pgn_text))
         
-        if not chess_game:
+        if final_board is None:
             raise ValueError("Could not parse game PGN")
         
-        # Analyze all moves
-        moves_analysis = []
-        board = chess_game.board()
+        # Walk the mainline once, recording every position. The snapshots
+        # carry no move history; the engine gets the history by replaying
+        # the game on a single board.
+        root = final_board.root()
+        board = root.copy()
+        moves = list(final_board.move_stack)
+        positions = [board.copy(stack=False)]
+        sans = []
         
-        # Detect opening using ECO
-        eco_detector = get_eco_detector()
+        for move in moves:
+            sans.append(board.san(move))
+            board.push(move)
+            positions.append(board.copy(stack=False))
         
-        prev_eval: Optional[EngineEvaluation] = None
+        # With a book, the game is in book for as long as its moves are
+        if self._book_path is not None:
+            opening_book_plies = self._count_book_plies(positions, moves)
         
-        for ply_index, move in enumerate(chess_game.mainline_moves()):
-            # Record position before move
-            fen_before = board.fen()
-            
-            # Evaluate position before move (if not already done)
-            if prev_eval is None:
-                eval_before = self.engine.evaluate(board, depth, time_per_move)
-            else:
-                eval_before = prev_eval
-            
-            # Get evaluation after best move (from same position)
-            board_copy = board.copy()
-            if eval_before.best_move:
-                board_copy.push(eval_before.best_move)
-                eval_best = self.engine.evaluate(board_copy, depth, time_per_move)
-            else:
-                eval_best = eval_before
-            
-            # Make the user's move
-            san = board.san(move)
-            board.push(move)
-            
-            # Record position after move
-            fen_after = board.fen()
+        # Start every game from a cleared engine hash table. Evaluations
+        # carried over from earlier games come only from _eval_cache, so
+        # the result can depend on which games were analysed before (see
+        # ChessEngine.new_game)
+        self.engine.new_game()
+        
+        # Evaluate every position in one batch. Position i is the position
+        # before ply i and the position after ply i - 1. Positions before
+        # book plies are never classified, so the engine skips them; the
+        # position reached by the last book ply is still evaluated.
+        # Transposed positions are evaluated once, at their first
+        # occurrence, and positions seen in earlier games not at all.
+        # Positions whose score depends on the game's history (repetitions,
+        # the fifty-move rule) are keyed by hash and ply instead, so each
+        # is searched with its own history and never cached.
+        first_evaluated = min(max(opening_book_plies, 0), len(moves))
+        position_keys = [chess.polyglot.zobrist_hash(root)]
+        for before, after in zip(positions, positions[1:]):
+            position_keys.append(_zobrist_after(before, after, position_keys[-1]))
+        eval_keys = [
+            (key, position_index) if dependent else key
+            for position_index, (key, dependent) in enumerate(
+                zip(position_keys, _history_dependent(positions, position_keys))
+            )
+        ]
+        evals_by_key = {}
+        first_index = {}
+        position_evals = []
+        if moves:
+            for position_index in range(first_evaluated, len(positions)):
+                first_index.setdefault(eval_keys[position_index], position_index)
+            evals_by_key = self._evaluate_distinct(
+                first_index,
+                lambda indices: _mainline_positions(root, moves, indices),
+                depth,
+                time_per_move
+            )
+            position_evals = [_BOOK_EVALUATION] * first_evaluated + [
+                evals_by_key[key] for key in eval_keys[first_evaluated:]
+            ]
+        
+        # The engine's score before a ply already is the score of its best
+        # move, so the position after that move is not searched separately.
+        # When the position has been evaluated anyway (the game move is the
+        # best move, or another ply reaches it) that evaluation is used,
+        # keeping the loss of a best move at exactly zero. Another ply's
+        # evaluation only stands in for a position reached later in the
+        # game, as the best move returning to an earlier one would repeat it.
+        best_evals = {}
+        for ply_index, eval_before in enumerate(position_evals[:-1]):
+            best_move = eval_before.best_move
+            if best_move == moves[ply_index]:
+                best_evals[ply_index] = position_evals[ply_index + 1]
+            elif (
+                best_move
+                and eval_keys[ply_index] == position_keys[ply_index]
+                and positions[ply_index].halfmove_clock + 1 < FIFTY_MOVE_HISTORY_CLOCK
+            ):
+                key = _key_after(positions[ply_index], position_keys[ply_index], best_move)
+                if first_index.get(key, -1) > ply_index:
+                    best_evals[ply_index] = evals_by_key[key]
+        
+        # A position where the best move was played gets checked for being
+        # critical. Those checks need a MultiPV search, so they run as one
+        # more batch here instead of one search at a time while classifying.
+        # Evaluations already searched with enough lines are used as they are.
+        multipv_evals = {}
+        critical_candidates = [
+            ply_index
+            for ply_index in range(first_evaluated, len(moves))
+            if position_evals[ply_index].best_move == moves[ply_index]
+            and len(position_evals[ply_index].pv_scores) < CRITICAL_MULTIPV
+            and not is_forced(positions[ply_index])
+        ]
+        if critical_candidates:
+            first_seen = {}
+            for ply_index in critical_candidates:
+                first_seen.setdefault(eval_keys[ply_index], ply_index)
+            original_multipv = self.engine.config.multipv
+            self.engine.config.multipv = CRITICAL_MULTIPV
+            try:
+                multipv_by_key = self._evaluate_distinct(
+                    first_seen,
+                    lambda indices: _mainline_positions(root, moves, indices),
+                    depth,
+                    time_per_move
+                )
+            except EngineAnalysisError:
+                # Without MultiPV support no position is critical; the
+                # placeholder has no lines, so nothing is searched again
+                multipv_by_key = dict.fromkeys(first_seen, _BOOK_EVALUATION)
+            finally:
+                self.engine.config.multipv = original_multipv
+            multipv_evals = {
+                ply_index: multipv_by_key[eval_keys[ply_index]]
+                for ply_index in critical_candidates
+            }
+        
+        # Serialize each position once; a ply's fen_after is the next ply's fen_before
+        fens = [position.fen() for position in positions]
+        
+        # Analyze all moves, splitting them by side and counting each
+        # side's classifications in the same pass
+        moves_analysis = []
+        white_moves = []
+        black_moves = []
+        white_counts = dict.fromkeys(MoveClassification, 0)
+        black_counts = dict.fromkeys(MoveClassification, 0)
+        
+        for ply_index, move in enumerate(moves):
+            is_white = ply_index % 2 == 0
+            eval_before = position_evals[ply_index]
+            eval_best = best_evals.get(ply_index, eval_before)
+            eval_user = position_evals[ply_index + 1]
             
-            # Evaluate position after user's move
-            eval_user = self.engine.evaluate(board, depth, time_per_move)
+            # Record positions before and after the move
+            fen_before = fens[ply_index]
+            fen_after = fens[ply_index + 1]
             
-            # Classify the move
+            # Classify the move. classify_move copies the board before
+            # playing anything on it, so the snapshot is passed as is.
             is_book = ply_index < opening_book_plies
             
             classification = classify_move(
@@ -143,34 +420,42 @@ class GameAnalyzer:
                 eval_best=eval_best,
                 eval_user=eval_user,
                 is_book=is_book,
-                board_before=chess.Board(fen_before),
-                engine=self.engine
+                board_before=positions[ply_index],
+                engine=self.engine,
+                multipv_eval=multipv_evals.get(ply_index)
             )
             
             # Create move analysis
             move_analysis = MoveAnalysis(
                 ply_index=ply_index,
-                san=san,
+                san=sans[ply_index],
                 uci=move.uci(),
                 fen_before=fen_before,
                 fen_after=fen_after,
                 eval_before_cp=eval_before.score_cp,
-                eval_best_cp=eval_best.score_cp,  # Eval after best move
+                eval_best_cp=eval_best.score_cp,  # Eval of the best move
                 eval_after_cp=eval_user.score_cp,  # Eval after user move
                 best_uci=eval_before.best_move.uci() if eval_before.best_move else None,
                 classification=classification,
                 is_book=is_book,
-                is_critical=classification == MoveClassification.CRITICAL,
-                is_brilliant=classification == MoveClassification.BRILLIANT
+                is_critical=classification is MoveClassification.CRITICAL,
+                is_brilliant=classification is MoveClassification.BRILLIANT,
+                cpl=_compute_cpl(
+                    1 if is_white else -1,
+                    eval_best.score_cp,
+                    eval_user.score_cp
+                )
             )
             
             moves_analysis.append(move_analysis)
-            prev_eval = eval_user
+            if is_white:
+                white_moves.append(move_analysis)
+                white_counts[classification] += 1
+            else:
+                black_moves.append(move_analysis)
+                black_counts[classification] += 1
         
         # Compute accuracy for each player
-        white_moves = [m for m in moves_analysis if m.ply_index % 2 == 0]
-        black_moves = [m for m in moves_analysis if m.ply_index % 2 == 1]
-        
         accuracy_white = compute_accuracy(white_moves)
         accuracy_black = compute_accuracy(black_moves)
         
@@ -178,16 +463,22 @@ class GameAnalyzer:
         perf_elo_white = self._estimate_performance_elo(
             accuracy_white, 
             white_moves, 
-            opponent_elo=game.black_elo
+            opponent_elo=game.black_elo,
+            counts=white_counts
         )
         perf_elo_black = self._estimate_performance_elo(
             accuracy_black, 
             black_moves, 
-            opponent_elo=game.white_elo
+            opponent_elo=game.white_elo,
+            counts=black_counts
         )
         
-        # Detect opening
-        eco_code, opening_name, opening_variation = eco_detector.detect_opening(board)
+        # Detect opening from the SAN moves gathered above. ECO lines start
+        # from the standard position, so games set up from a FEN get none.
+        if root == chess.Board():
+            eco_code, opening_name, opening_variation = get_eco_detector().detect_opening_san(sans)
+        else:
+            eco_code, opening_name, opening_variation = None, None, None
         
         return GameAnalysisResult(
             moves=moves_analysis,
@@ -203,11 +494,73 @@ class GameAnalyzer:
             opening_variation=opening_variation
         )
     
+    def _count_book_plies(self, positions: List[chess.Board], moves: List[chess.Move]) -> int:
+        """Count the leading plies whose moves are in the opening book."""
+        with chess.polyglot.open_reader(self._book_path) as book:
+            for ply_index, (position, move) in enumerate(zip(positions, moves)):
+                if not any(entry.move == move for entry in book.find_all(position)):
+                    return ply_index
+        return len(moves)
+    
+    def _evaluate_distinct(
+        self,
+        positions: dict,
+        boards: Callable[[Iterable], Iterator[chess.Board]],
+        depth: Optional[int],
+        time_per_move: Optional[float]
+    ) -> Dict[int, EngineEvaluation]:
+        """
+        Evaluate positions keyed by Zobrist hash, reusing cached evaluations.
+        
+        Positions keyed by (hash, ply) depend on the game's history (see
+        _history_dependent); they are always searched and never cached.
+        
+        Args:
+            positions: Zobrist hash -> where to find the position, in the
+                order boards() expects
+            boards: Yields the board for each of the given locations
+            depth: Analysis depth (None = use engine default)
+            time_per_move: Time per move in seconds (None = use engine default)
+            
+        Returns:
+            Zobrist hash -> evaluation for every given position
+        """
+        limits = (depth, time_per_move, self.engine.config.multipv)
+        evaluations = {}
+        missing = {}
+        
+        for key, location in positions.items():
+            cached = None
+            cache_key = (key, limits)
+            if isinstance(key, int):
+                cached = self._eval_cache.get(cache_key)
+                if cached is not None:
+                    self._eval_cache.move_to_end(cache_key)
+            
+            if cached is None:
+                missing[key] = location
+            else:
+                evaluations[key] = cached
+        
+        for key, evaluation in zip(
+            missing,
+            self.engine.evaluate_positions(boards(missing.values()), depth, time_per_move)
+        ):
+            evaluations[key] = evaluation
+            if self.eval_cache_size > 0 and isinstance(key, int):
+                self._eval_cache[(key, limits)] = evaluation
+        
+        while len(self._eval_cache) > self.eval_cache_size:
+            self._eval_cache.popitem(last=False)
+        
+        return evaluations
+    
     def _estimate_performance_elo(
         self, 
         accuracy: float, 
         moves: List['MoveAnalysis'],
-        opponent_elo: Optional[int] = None
+        opponent_elo: Optional[int] = None,
+        counts: Optional[dict] = None
     ) -> int:
         """
         Estimate performance Elo based on ACPL (Average Centipawn Loss) and error rates.
@@ -218,6 +571,7 @@ class GameAnalyzer:
             accuracy: Accuracy percentage (0-100) - for legacy compatibility
             moves: List of move analyses
             opponent_elo: Opponent's Elo rating (for capping)
+            counts: Classification counts of moves, if already known
             
         Returns:
             Estimated performance Elo rating (500-3000)
@@ -234,9 +588,11 @@ class GameAnalyzer:
             return 1500  # Cannot compute without cp loss data
         
         # C) Normalize error rates by 40 moves
-        blunders = sum(1 for m in moves if m.classification == MoveClassification.BLUNDER)
-        mistakes = sum(1 for m in moves if m.classification == MoveClassification.MISTAKE)
-        inaccuracies = sum(1 for m in moves if m.classification == MoveClassification.INACCURACY)
+        if counts is None:
+            counts = count_move_types(moves)
+        blunders = counts[MoveClassification.BLUNDER]
+        mistakes = counts[MoveClassification.MISTAKE]
+        inaccuracies = counts[MoveClassification.INACCURACY]
         
         # Normalize to per-40-moves rate
         num_moves = len(moves)
@@ -285,36 +641,8 @@ class GameAnalyzer:
         Returns:
             Average centipawn loss, or None if cannot compute
         """
-        cp_losses = []
-        
-        for move in moves:
-            # Skip book moves
-            if move.is_book:
-                continue
-            
-            # Skip if we don't have evaluation data
-            if move.eval_best_cp is None or move.eval_after_cp is None:
-                continue
-            
-            # Calculate CPL for this move
-            # CPL is already stored as the difference, but let's recalculate for accuracy
-            # Since eval_best_cp and eval_after_cp are from different positions,
-            # we need to calculate the loss from the player's perspective
-            
-            # eval_best_cp: evaluation after best move (from White's POV)
-            # eval_after_cp: evaluation after user's move (from White's POV)
-            # We need to convert to moving player's POV
-            
-            is_white_move = (move.ply_index % 2 == 0)
-            
-            if is_white_move:
-                # White's move: higher is better
-                cp_loss = max(0, move.eval_best_cp - move.eval_after_cp)
-            else:
-                # Black's move: lower is better
-                cp_loss = max(0, move.eval_after_cp - move.eval_best_cp)
-            
-            cp_losses.append(cp_loss)
+        # Book moves and moves without evaluations don't count
+        cp_losses = [m.cpl for m in moves if not m.is_book and m.cpl is not None]
         
         if not cp_losses:
             return None
@@ -322,6 +650,93 @@ class GameAnalyzer:
         return sum(cp_losses) / len(cp_losses)
 
 
+# Analyzer owned by each worker process of analyze_games_parallel
+_worker_analyzer: Optional[GameAnalyzer] = None
+
+
+def _init_analysis_worker(config: EngineConfig) -> None:
+    """Create the worker process's engine; it starts on first use."""
+    global _worker_analyzer
+    _worker_analyzer = GameAnalyzer(ChessEngine(config))
+
+
+def _analyze_payload(
+    payload: Tuple[int, str, Optional[int], Optional[int]],
+    depth: Optional[int],
+    time_per_move: Optional[float],
+    opening_book_plies: int
+) -> Tuple[int, Optional[GameAnalysisResult], Optional[str]]:
+    """Analyze one game inside a worker process."""
+    game_id, pgn_text, white_elo, black_elo = payload
+    game = Game(pgn_text=pgn_text, white_elo=white_elo, black_elo=black_elo)
+    try:
+        result = _worker_analyzer.analyze_game(
+            game, depth, time_per_move, opening_book_plies
+        )
+        return game_id, result, None
+    except Exception as e:
+        return game_id, None, str(e)
+
+
+def analyze_games_parallel(
+    games: Iterable[Game],
+    config: EngineConfig,
+    workers: Optional[int] = None,
+    depth: Optional[int] = None,
+    time_per_move: Optional[float] = None,
+    opening_book_plies: int = 12,
+    timeout: Optional[float] = None
+) -> Iterator[Tuple[int, Optional[GameAnalysisResult], Optional[str]]]:
+    """
+    Analyze several games at once, one engine process per worker.
+    
+    Only the PGN text and Elo ratings are sent to the workers, so the games
+    may belong to an open session. Results should be saved by the caller,
+    keeping all database access in this process. Each worker keeps its
+    analyzer's evaluation cache across the games it is given, so positions
+    common to its games (typically the opening) are searched once per
+    worker.
+    
+    Args:
+        games: Games to analyze
+        config: Engine configuration; each worker runs with one thread
+        workers: Number of worker processes (None = CPU count)
+        depth: Analysis depth (None = use engine default)
+        time_per_move: Time per move in seconds (None = use engine default)
+        opening_book_plies: Number of plies to consider as book moves
+        timeout: Seconds to wait for each next result (None = no limit)
+        
+    Yields:
+        (game_id, result, error) in completion order; result is None and
+        error holds the message if the game could not be analyzed
+        
+    Raises:
+        multiprocessing.TimeoutError: If no game finishes within timeout
+    """
+    payloads = [(g.id, g.pgn_text, g.white_elo, g.black_elo) for g in games]
+    if not payloads:
+        return
+    
+    workers = min(workers or os.cpu_count() or 1, len(payloads))
+    analyze = partial(
+        _analyze_payload,
+        depth=depth,
+        time_per_move=time_per_move,
+        opening_book_plies=opening_book_plies
+    )
+    
+    # Spawned workers are safe to start from GUI worker threads
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        workers,
+        initializer=_init_analysis_worker,
+        initargs=(replace(config, threads=1),)
+    ) as pool:
+        results = pool.imap_unordered(analyze, payloads)
+        for _ in payloads:
+            yield results.next(timeout)
+
+
 def save_analysis_to_db(
     session,
     game: Game,
@@ -338,15 +753,16 @@ def save_analysis_to_db(
     Returns:
         Saved Analysis object
     """
-    # Delete old analysis if it exists (for reanalysis)
-    old_analysis = session.query(Analysis).filter(Analysis.game_id == game.id).first()
-    if old_analysis:
-        # Delete associated moves first
-        session.query(Move).filter(Move.game_id == game.id).delete(synchronize_session='fetch')
-        # Delete the analysis record
-        session.query(Analysis).filter(Analysis.game_id == game.id).delete(synchronize_session='fetch')
-        # Flush to ensure deletion happens immediately
-        session.flush()
+    # Delete any earlier analysis of this game (for reanalysis). Deleting
+    # nothing is a no-op, so there is no existence check. "evaluate" drops
+    # already loaded rows from the session by matching game_id in Python,
+    # without the extra SELECT that "fetch" issues, and nothing needs an
+    # interim flush before the new rows are added.
+    for model in (Move, Analysis, GameAnalytics):
+        session.execute(
+            delete(model).where(model.game_id == game.id),
+            execution_options={"synchronize_session": "evaluate"}
+        )
     
     # Create Analysis record
     analysis = Analysis(
@@ -368,11 +784,11 @@ def save_analysis_to_db(
         game.opening_name = analysis_result.opening_name
         game.opening_variation = analysis_result.opening_variation
     
-    # Create Move records
+    # Create Move records with a single bulk INSERT
+    move_rows = []
     for move_analysis in analysis_result.moves:
         player_color = "white" if move_analysis.ply_index % 2 == 0 else "black"
-        cpl = _compute_cpl(player_color, move_analysis.eval_best_cp, move_analysis.eval_after_cp)
-        move = Move(
+        move_rows.append(dict(
             game_id=game.id,
             ply_index=move_analysis.ply_index,
             san=move_analysis.san,
@@ -382,7 +798,7 @@ def save_analysis_to_db(
             eval_before_cp=move_analysis.eval_before_cp,
             eval_best_cp=move_analysis.eval_best_cp,
             eval_after_cp=move_analysis.eval_after_cp,
-            cpl=cpl,
+            cpl=move_analysis.cpl,
             player_color=player_color,
             best_uci=move_analysis.best_uci,
             classification=move_analysis.classification.name,
@@ -390,11 +806,12 @@ def save_analysis_to_db(
             is_critical=move_analysis.is_critical,
             is_brilliant=move_analysis.is_brilliant,
             comment=move_analysis.comment
-        )
-        session.add(move)
+        ))
+    
+    if move_rows:
+        session.execute(insert(Move), move_rows)
 
-    # Replace existing analytics for this game
-    session.query(GameAnalytics).filter(GameAnalytics.game_id == game.id).delete()
+    # Cache analytics for this game
     analytics_row = _compute_game_analytics(game, analysis_result)
     session.add(analytics_row)
     
@@ -402,17 +819,13 @@ def save_analysis_to_db(
     return analysis
 
 
-def _compute_cpl(player_color: str, eval_best_cp: Optional[int], eval_after_cp: Optional[int]) -> Optional[int]:
-    """Compute CPL from the player's perspective."""
+def _compute_cpl(sign: int, eval_best_cp: Optional[int], eval_after_cp: Optional[int]) -> Optional[int]:
+    """Compute CPL from the player's perspective (sign: 1 for White, -1 for Black)."""
     if eval_best_cp is None or eval_after_cp is None:
         return None
 
-    if player_color == "white":
-        diff = eval_best_cp - eval_after_cp
-    else:
-        diff = eval_after_cp - eval_best_cp
-
-    return max(0, diff)
+    loss = (eval_best_cp - eval_after_cp) * sign
+    return loss if loss > 0 else 0
 
 
 def _phase_from_ply(ply_index: int) -> str:
@@ -454,7 +867,7 @@ def _compute_game_analytics(game: Game, analysis_result: GameAnalysisResult) ->
         phase = _phase_from_ply(move.ply_index)
         classification = move.classification.name.upper()
 
-        cpl = _compute_cpl(player_color, move.eval_best_cp, move.eval_after_cp)
+        cpl = move.cpl
 
         # Skip book moves for ACPL and CPL distribution
         if not move.is_book and cpl is not None:
@@ -5,15 +5,44 @@ Fetches monthly archives via the public Chess.com API and returns PGN strings.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import gzip
+import hashlib
 import json
-import urllib.request
+import os
+import re
+import threading
+import time
 import urllib.error
+import urllib.request
+from email.message import Message
 
 
 BASE_URL = "https://api.chess.com/pub/player"
 
+REQUEST_HEADERS = {
+    "User-Agent": "DCO/1.0 (https://github.com/SV-Nikolov/DCO)",
+    "Accept-Encoding": "gzip",
+}
+
+# Archive months fetched at once. Chess.com answers parallel requests with
+# 429 when there are too many, so this stays small.
+ARCHIVE_FETCH_WORKERS = 4
+
+# Year and month at the end of an archive URL (.../games/YYYY/MM)
+_ARCHIVE_MONTH_RE = re.compile(r"/(\d{4})/(\d{1,2})/?$")
+
+# Monthly archives are cached here, relative to the working directory like
+# the database
+CACHE_DIR = os.path.join("data", "cache", "chesscom")
+
+# Attempts per request when rate limited, and the longest wait between them
+RATE_LIMIT_ATTEMPTS = 3
+MAX_RETRY_AFTER = 10.0
+
 
 def fetch_chesscom_pgns(
     username: str,
@@ -44,7 +73,8 @@ def fetch_chesscom_pgns(
     if not username:
         return [], ["Username is required."]
 
-    archive_urls = _get_archives(username, errors)
+    fetcher = _JsonFetcher(CACHE_DIR)
+    archive_urls = _get_archives(fetcher, username, errors)
     if not archive_urls:
         if not errors:
             errors.append("No archive months available for this username.")
@@ -53,71 +83,193 @@ def fetch_chesscom_pgns(
     start_ym = _to_year_month(start_date)
     end_ym = _to_year_month(end_date)
 
+    month_urls = []
     for archive_url in archive_urls:
         year_month = _parse_archive_year_month(archive_url)
         if year_month is None:
             continue
         if not _month_in_range(year_month, start_ym, end_ym):
             continue
-
-        games, fetch_errors = _fetch_games(archive_url)
-        errors.extend(fetch_errors)
-        for game in games:
-            pgn = game.get("pgn")
-            if not pgn:
-                continue
-
-            if rated_only and not game.get("rated", False):
-                continue
-            if time_class and game.get("time_class") != time_class:
-                continue
-            if rules and game.get("rules") != rules:
-                continue
-
-            if not _game_in_range(game, start_date, end_date):
-                continue
-
-            pgns.append(pgn)
+        month_urls.append(archive_url)
+
+    # Months are independent; map() keeps them in archive order. Each
+    # month is filtered by its worker, so only matching PGNs are kept.
+    fetch_month = partial(
+        _fetch_pgns, fetcher,
+        rated_only=rated_only,
+        time_class=time_class,
+        rules=rules,
+        start_date=start_date,
+        end_date=end_date
+    )
+    with ThreadPoolExecutor(max_workers=ARCHIVE_FETCH_WORKERS) as executor:
+        for month_pgns, fetch_errors in executor.map(fetch_month, month_urls):
+            pgns.extend(month_pgns)
+            errors.extend(fetch_errors)
 
     return pgns, errors
 
 
-def _get_archives(username: str, errors: List[str]) -> List[str]:
+def _get_archives(fetcher: _JsonFetcher, username: str, errors: List[str]) -> List[str]:
     """Fetch list of archive URLs for a username."""
     url = f"{BASE_URL}/{username}/games/archives"
-    data, fetch_errors = _fetch_json(url)
+    data, fetch_errors = fetcher.fetch(url)
     errors.extend(fetch_errors)
     if not data:
         return []
     return data.get("archives", []) or []
 
 
-def _fetch_games(archive_url: str) -> Tuple[List[dict], List[str]]:
-    """Fetch games for a monthly archive URL."""
-    data, errors = _fetch_json(archive_url)
+def _fetch_pgns(
+    fetcher: _JsonFetcher,
+    archive_url: str,
+    rated_only: bool,
+    time_class: Optional[str],
+    rules: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> Tuple[List[str], List[str]]:
+    """Fetch a monthly archive and return the PGNs of its matching games."""
+    year_month = _parse_archive_year_month(archive_url)
+    final = year_month is not None and _is_final_month(year_month)
+    data, errors = fetcher.fetch(archive_url, cached=True, final=final)
     if not data:
         return [], errors
-    return data.get("games", []) or [], errors
 
+    pgns: List[str] = []
+    for game in data.get("games", []) or []:
+        if rated_only and not game.get("rated", False):
+            continue
+        if time_class and game.get("time_class") != time_class:
+            continue
+        if rules and game.get("rules") != rules:
+            continue
+
+        if not _game_in_range(game, start_date, end_date):
+            continue
 
-def _fetch_json(url: str) -> Tuple[Optional[dict], List[str]]:
-    """Fetch JSON data with a basic user agent."""
-    req = urllib.request.Request(
-        url,
-        headers={"User-Agent": "DCO/1.0 (https://github.com/SV-Nikolov/DCO)"}
-    )
+        pgn = game.get("pgn")
+        if pgn:
+            pgns.append(pgn)
+
+    return pgns, errors
+
+
+class _JsonFetcher:
+    """
+    Fetches JSON documents through one urllib opener.
+
+    The opener is built once, and honours the HTTP(S)_PROXY environment
+    variables and redirects like urlopen. Documents fetched with
+    cached=True are also stored in cache_dir, keyed by URL, together with
+    their ETag and Last-Modified headers.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self._opener = urllib.request.build_opener()
+
+    def fetch(self, url: str, cached: bool = False, final: bool = False) -> Tuple[Optional[dict], List[str]]:
+        """
+        Fetch JSON data, accepting a gzip-compressed response.
+
+        Args:
+            url: URL of the JSON document
+            cached: Whether to keep the document in the cache
+            final: Whether the document can no longer change; a cached
+                final document is returned without asking the server,
+                any other cached document is revalidated
+
+        Returns:
+            Tuple of (data or None, errors)
+        """
+        entry = self._read_cache(url) if cached else None
+        if entry is not None and final:
+            return entry["data"], []
+
+        request_headers = dict(REQUEST_HEADERS)
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            for attempt in range(RATE_LIMIT_ATTEMPTS):
+                status, headers, body = self._get(url, request_headers)
+                if status != 429 or attempt == RATE_LIMIT_ATTEMPTS - 1:
+                    break
+                time.sleep(_retry_after(headers.get("Retry-After")))
+
+            if status == 304 and entry is not None:
+                return entry["data"], []
+            if status != 200:
+                return None, [f"HTTP error {status} for {url}"]
+            if headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            data = json.loads(body.decode("utf-8"))
+        except urllib.error.URLError as exc:
+            return None, [f"Network error for {url}: {exc.reason}"]
+        except OSError as exc:
+            return None, [f"Network error for {url}: {exc}"]
+        except Exception as exc:
+            return None, [f"Failed to fetch {url}: {exc}"]
+
+        if cached:
+            self._write_cache(url, {
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "data": data,
+            })
+        return data, []
+
+    def _cache_path(self, url: str) -> str:
+        """Cache file of a URL."""
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json.gz")
+
+    def _read_cache(self, url: str) -> Optional[dict]:
+        """Return the cache entry of a URL, or None if there is none."""
+        if self.cache_dir is None:
+            return None
+        try:
+            with gzip.open(self._cache_path(url), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url: str, entry: dict) -> None:
+        """Store the cache entry of a URL."""
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+        except OSError:
+            # The cache is only an optimization; the fetched data is still used
+            pass
+
+    def _get(self, url: str, headers: Dict[str, str]) -> Tuple[int, Message, bytes]:
+        """Send a GET request and return (status, headers, body), also for error statuses."""
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with self._opener.open(request, timeout=20) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as exc:
+            with exc:
+                return exc.code, exc.headers, exc.read()
+
+
+def _retry_after(value: Optional[str]) -> float:
+    """Seconds to wait before retrying a rate-limited request."""
     try:
-        with urllib.request.urlopen(req, timeout=20) as response:
-            if response.status != 200:
-                return None, [f"HTTP {response.status} for {url}"]
-            data = json.loads(response.read().decode("utf-8"))
-            return data, []
-    except urllib.error.HTTPError as exc:
-        return None, [f"HTTP error {exc.code} for {url}"]
-    except urllib.error.URLError as exc:
-        return None, [f"Network error for {url}: {exc.reason}"]
-    except Exception as exc:
-        return None, [f"Failed to fetch {url}: {exc}"]
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return 1.0
 
 
 def _game_in_range(
@@ -161,15 +313,17 @@ def _to_year_month(value: Optional[datetime]) -> Optional[Tuple[int, int]]:
 
 def _parse_archive_year_month(url: str) -> Optional[Tuple[int, int]]:
     """Extract (year, month) from an archive URL."""
-    parts = url.strip("/").split("/")
-    if len(parts) < 2:
-        return None
-    try:
-        year = int(parts[-2])
-        month = int(parts[-1])
-        return year, month
-    except ValueError:
+    match = _ARCHIVE_MONTH_RE.search(url)
+    if match is None:
         return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def _is_final_month(year_month: Tuple[int, int]) -> bool:
+    """Return True if no more games can be added to an archive month."""
+    # Leave a day for games that end around midnight to show up
+    cutoff = datetime.now(timezone.utc) - timedelta(days=1)
+    return year_month < (cutoff.year, cutoff.month)
 
 
 def _month_in_range(
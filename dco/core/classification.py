@@ -3,11 +3,15 @@ Move classification logic for DCO.
 Classifies chess moves as book, best, excellent, good, inaccuracy, mistake, blunder, critical, or brilliant.
 """
 
+from collections import OrderedDict
+from statistics import median
 from typing import Optional, TYPE_CHECKING
+import weakref
 import chess
+import chess.polyglot
 from enum import Enum
 
-from .engine import EngineEvaluation
+from .engine import EngineAnalysisError, EngineEvaluation
 
 if TYPE_CHECKING:
     from .engine import ChessEngine
@@ -41,10 +45,20 @@ UNIQUE_GAP = 120  # E1 - E2 gap for uniqueness
 BREADTH_GAP = 150  # E1 - median(E2..E5) gap
 WORST_GAP = 250  # E1 - E5 gap
 DECIDED_SUPPRESS = 600  # Don't mark critical if position already decided
+CRITICAL_MULTIPV = 5  # Candidate moves compared per position
 
 # PV horizon for sacrifice verification (plies to look ahead)
 PV_HORIZON = 8
 
+# Approximate piece values, indexed by piece type (None, pawn, ..., king)
+_PIECE_VALUES = (0, 1, 3, 3, 5, 9, 0)
+
+# Verification searches kept per engine, so positions met again (repetitions,
+# transpositions, re-analysis) are not searched twice. This is the only cache
+# in front of ChessEngine.evaluate for these searches.
+VERIFICATION_CACHE_SIZE = 2048
+_verification_caches: "weakref.WeakKeyDictionary[object, OrderedDict]" = weakref.WeakKeyDictionary()
+
 
 def classify_move(
     move: chess.Move,
@@ -53,7 +67,8 @@ def classify_move(
     eval_user: EngineEvaluation,
     is_book: bool,
     board_before: chess.Board,
-    engine: Optional['ChessEngine'] = None
+    engine: Optional['ChessEngine'] = None,
+    multipv_eval: Optional[EngineEvaluation] = None
 ) -> MoveClassification:
     """
     Classify a chess move based on engine evaluation.
@@ -63,10 +78,14 @@ def classify_move(
     Args:
         move: The move played by user
         eval_before: Engine evaluation of position before any move
-        eval_best: Engine evaluation after playing the best move
+        eval_best: Engine evaluation of the best move (after playing it, or
+            eval_before itself when that position was not searched)
         eval_user: Engine evaluation after playing the user's move
         is_book: Whether this is a book move
         board_before: Board position before the move
+        engine: Chess engine for verification searches
+        multipv_eval: MultiPV=CRITICAL_MULTIPV evaluation of board_before,
+            if the caller already has one; searched on demand otherwise
         
     Returns:
         Move classification
@@ -79,8 +98,13 @@ def classify_move(
     is_best_move = eval_before.best_move and move == eval_before.best_move
     
     if is_best_move:
+        # The only legal move can be neither critical nor brilliant, so
+        # don't spend engine searches finding that out
+        if is_forced(board_before):
+            return MoveClassification.BEST
+        
         # Check for critical position flag
-        if engine and _is_critical_position(eval_before, board_before, engine):
+        if engine and _is_critical_position(eval_before, board_before, engine, multipv_eval):
             return MoveClassification.CRITICAL
         
         # Check for brilliant (strong sacrifice)
@@ -90,18 +114,21 @@ def classify_move(
         
         return MoveClassification.BEST
     
-    # Calculate centipawn loss
-    cp_loss = _calculate_cp_loss(eval_best, eval_user, board_before.turn)
-    
-    # Handle mate situations
-    mate_classification = _classify_mate_situation(eval_best, eval_user, board_before.turn)
-    if mate_classification is not None:
-        return mate_classification
-    
-    # Classify based on centipawn loss
-    if cp_loss is None:
+    # Handle mate situations; most moves have no mate score at all
+    if eval_best.score_mate is not None or eval_user.score_mate is not None:
+        mate_classification = _classify_mate_situation(eval_best, eval_user, board_before.turn)
+        if mate_classification is not None:
+            return mate_classification
+    
+    # Calculate centipawn loss as in _calculate_cp_loss, inline since this
+    # runs for every move that is not the best one
+    best_cp = eval_best.score_cp
+    user_cp = eval_user.score_cp
+    if best_cp is None or user_cp is None:
         return MoveClassification.GOOD  # Default if we can't calculate
+    cp_loss = best_cp - user_cp if board_before.turn == chess.WHITE else user_cp - best_cp
     
+    # Classify based on centipawn loss (a negative loss counts as none)
     if cp_loss <= EXCELLENT_THRESHOLD:
         # Check for brilliant among excellent moves
         if engine and not is_book:
@@ -118,6 +145,12 @@ def classify_move(
         return MoveClassification.BLUNDER
 
 
+def is_forced(board: chess.Board) -> bool:
+    """Return True if the side to move has exactly one legal move."""
+    legal_moves = iter(board.legal_moves)
+    return next(legal_moves, None) is not None and next(legal_moves, None) is None
+
+
 def _calculate_cp_loss(
     eval_best: EngineEvaluation,
     eval_user: EngineEvaluation,
@@ -139,28 +172,46 @@ def _calculate_cp_loss(
     if eval_best.score_cp is None or eval_user.score_cp is None:
         return None
     
-    # Both evaluations are from White's perspective
-    # Convert to moving player's perspective
-    if side_to_move == chess.WHITE:
-        # White's perspective: positive is good for white
-        score_best = eval_best.score_cp
-        score_user = eval_user.score_cp
-    else:
-        # Black's perspective: negate scores (negative is good for black)
-        score_best = -eval_best.score_cp
-        score_user = -eval_user.score_cp
-    
-    # CPL = how much worse the user move is compared to best
-    loss = score_best - score_user
+    # Both evaluations are from White's perspective; the sign turns their
+    # difference into how much worse the user move is for the mover
+    sign = 1 if side_to_move == chess.WHITE else -1
+    loss = (eval_best.score_cp - eval_user.score_cp) * sign
     
     # Loss should be non-negative
-    return max(0, loss)
+    return loss if loss > 0 else 0
+
+
+def _evaluate_cached(engine: 'ChessEngine', board: chess.Board, depth: int) -> EngineEvaluation:
+    """
+    Evaluate a position at a fixed depth, reusing the engine's earlier result.
+    
+    Results are kept per engine, keyed by position, halfmove clock, depth
+    and the engine's current MultiPV setting, least recently used first.
+    Verification boards are snapshots without a move stack, so the position
+    and clock are everything the engine is sent.
+    """
+    cache = _verification_caches.get(engine)
+    if cache is None:
+        cache = _verification_caches[engine] = OrderedDict()
+    
+    key = (chess.polyglot.zobrist_hash(board), board.halfmove_clock, depth, engine.config.multipv)
+    evaluation = cache.get(key)
+    if evaluation is not None:
+        cache.move_to_end(key)
+        return evaluation
+    
+    evaluation = engine.evaluate(board, depth=depth)
+    cache[key] = evaluation
+    if len(cache) > VERIFICATION_CACHE_SIZE:
+        cache.popitem(last=False)
+    return evaluation
 
 
 def _is_critical_position(
     eval_before: EngineEvaluation,
     board: chess.Board,
-    engine: 'ChessEngine'
+    engine: 'ChessEngine',
+    multi_eval: Optional[EngineEvaluation] = None
 ) -> bool:
     """
     Determine if position is critical (only one clearly best move).
@@ -172,104 +223,75 @@ def _is_critical_position(
     4. Position not already decided (abs(E1) < DECIDED_SUPPRESS, except mate)
     5. Not a book move (checked by caller)
     
-    Uses MultiPV=5 to evaluate top 5 candidate moves.
+    Uses the scores of a single MultiPV=5 search for the top 5 candidate moves.
     
     Args:
         eval_before: Engine evaluation with multiple PVs
         board: Board position
         engine: Chess engine for MultiPV=5 analysis
+        multi_eval: MultiPV=5 evaluation of board, if already searched
         
     Returns:
         True if position is critical
     """
-    # Need MultiPV=5 analysis
-    # Save current multipv setting
-    original_multipv = engine.config.multipv
+    # An eval_before searched with MultiPV>=5 already has every candidate
+    if multi_eval is None and len(eval_before.pv_scores) >= CRITICAL_MULTIPV:
+        multi_eval = eval_before
+    
+    if multi_eval is None:
+        original_multipv = engine.config.multipv
+        engine.config.multipv = CRITICAL_MULTIPV
+        try:
+            multi_eval = _evaluate_cached(engine, board, eval_before.depth)
+        except EngineAnalysisError:
+            # If MultiPV analysis fails, not critical
+            return False
+        finally:
+            engine.config.multipv = original_multipv
     
-    try:
-        # Set MultiPV to 5 for critical detection
-        engine.config.multipv = 5
-        
-        # Re-evaluate position with MultiPV=5
-        multi_eval = engine.evaluate(board, depth=eval_before.depth)
-        
-        # Restore original multipv
-        engine.config.multipv = original_multipv
-        
-        # Need at least 2 moves to compare
-        if len(multi_eval.pv_lines) < 2:
+    # Need at least 2 moves to compare
+    if len(multi_eval.pv_lines) < 2:
+        return False
+    
+    # Scores of the candidate moves come with the MultiPV search itself;
+    # the sign converts them to the side to move's perspective
+    sign = 1 if board.turn == chess.WHITE else -1
+    evaluations = [
+        score * sign
+        for score in multi_eval.pv_scores[:5]
+        if score is not None
+    ]
+    
+    # Need at least 2 evaluations to compare
+    if len(evaluations) < 2:
+        return False
+    
+    E1 = evaluations[0]  # Best move
+    E2 = evaluations[1]  # Second best
+    
+    # Check 4: Suppress if already decided (unless mate-related)
+    if abs(E1) >= DECIDED_SUPPRESS:
+        # Allow critical only if it's mate-related
+        if multi_eval.score_mate is None:
             return False
-        
-        # Extract evaluations for each candidate move
-        # We need to evaluate each PV line to get its score
-        evaluations = []
-        
-        for i, pv_line in enumerate(multi_eval.pv_lines[:5]):
-            if not pv_line:
-                continue
-            
-            # Play the first move of this PV
-            test_board = board.copy()
-            test_board.push(pv_line[0])
-            
-            # Get evaluation after this move
-            pv_eval = engine.evaluate(test_board, depth=max(15, eval_before.depth - 2))
-            
-            if pv_eval.score_cp is not None:
-                # Convert to side-to-move perspective
-                if board.turn == chess.WHITE:
-                    score = pv_eval.score_cp
-                else:
-                    score = -pv_eval.score_cp
-                evaluations.append(score)
-        
-        # Need at least 2 evaluations to compare
-        if len(evaluations) < 2:
+    
+    # Check 1: Uniqueness gap (E1 - E2 >= UNIQUE_GAP)
+    if E1 - E2 < UNIQUE_GAP:
+        return False
+    
+    # Check 2: Breadth collapse (need at least 3 moves)
+    if len(evaluations) >= 3:
+        median_rest = median(evaluations[1:5])  # E2 through E5
+        if E1 - median_rest < BREADTH_GAP:
             return False
-        
-        E1 = evaluations[0]  # Best move
-        E2 = evaluations[1]  # Second best
-        
-        # Check 4: Suppress if already decided (unless mate-related)
-        if abs(E1) >= DECIDED_SUPPRESS:
-            # Allow critical only if it's mate-related
-            if multi_eval.score_mate is None:
-                return False
-        
-        # Check 1: Uniqueness gap (E1 - E2 >= UNIQUE_GAP)
-        if E1 - E2 < UNIQUE_GAP:
+    
+    # Check 3: Worst collapse (need at least 5 moves)
+    if len(evaluations) >= 5:
+        E5 = evaluations[4]
+        if E1 - E5 < WORST_GAP:
             return False
-        
-        # Check 2: Breadth collapse (need at least 3 moves)
-        if len(evaluations) >= 3:
-            median_rest = _median(evaluations[1:5])  # E2 through E5
-            if E1 - median_rest < BREADTH_GAP:
-                return False
-        
-        # Check 3: Worst collapse (need at least 5 moves)
-        if len(evaluations) >= 5:
-            E5 = evaluations[4]
-            if E1 - E5 < WORST_GAP:
-                return False
-        
-        return True
-        
-    except:
-        # If MultiPV analysis fails, not critical
-        engine.config.multipv = original_multipv
-        return False
-
-
-def _median(values: list) -> float:
-    """Calculate median of a list of numbers."""
-    if not values:
-        return 0.0
-    sorted_vals = sorted(values)
-    n = len(sorted_vals)
-    if n % 2 == 0:
-        return (sorted_vals[n//2 - 1] + sorted_vals[n//2]) / 2
-    else:
-        return sorted_vals[n//2]
+    
+    return True
 
 
 def _is_brilliant_move(
@@ -302,59 +324,63 @@ def _is_brilliant_move(
     Returns:
         True if move is brilliant
     """
+    turn = board.turn
+    
     # A) Candidate check: Must be Best or Excellent
     is_best = eval_before.best_move and move == eval_before.best_move
     if not is_best:
-        cp_loss = _calculate_cp_loss(eval_best, eval_user, board.turn)
+        cp_loss = _calculate_cp_loss(eval_best, eval_user, turn)
         if cp_loss is None or cp_loss > EXCELLENT_THRESHOLD:
             return False
     
+    # A) Not a checking move (obvious)
+    if board.gives_check(move):
+        return False
+    
+    # A) Not a capture of a piece worth at least the capturing one; such a
+    # capture cannot lose material, whatever the recaptures
+    captured = board.piece_type_at(move.to_square)
+    if captured and _PIECE_VALUES[captured] >= _PIECE_VALUES[board.piece_type_at(move.from_square)]:
+        return False
+    
     # A) Not a recapture
     if _is_recapture(move, board):
         return False
     
     # A) Not the only legal move
-    if board.legal_moves.count() <= 1:
-        return False
-    
-    # A) Not a checking move (obvious)
-    board_copy = board.copy()
-    board_copy.push(move)
-    if board_copy.is_check():
+    if is_forced(board):
         return False
     
     # B) Trade-proof sacrifice detection
-    material_before = _calculate_material(board, board.turn)
+    # Not a sacrifice unless the best exchange sequence on the target
+    # square loses material for the mover
+    exchange = _see(board, move)
+    if exchange >= 0:
+        return False
     
-    # Apply user move
-    board_after = board.copy()
+    material_before = _calculate_material(board, turn)
+    board_after = board.copy(stack=False)
     board_after.push(move)
-    material_immediate = _calculate_material(board_after, board.turn)
-    
-    # If no material lost immediately, not a sacrifice
-    if material_immediate >= material_before:
-        return False
     
     # Check if material deficit persists after PV horizon
-    # Play out engine's PV continuation for PV_HORIZON plies
-    pv_board = board_after.copy()
+    # Play out engine's PV continuation for PV_HORIZON plies on board_after,
+    # taking the moves back afterwards
     pv_moves_played = 0
     
     if eval_user.pv_lines and len(eval_user.pv_lines) > 0:
         pv = eval_user.pv_lines[0]
         for pv_move in pv[:PV_HORIZON]:
-            if pv_board.is_game_over():
-                break
-            try:
-                pv_board.push(pv_move)
-                pv_moves_played += 1
-            except:
+            if board_after.is_game_over():
                 break
+            board_after.push(pv_move)
+            pv_moves_played += 1
+    
+    material_horizon = _calculate_material(board_after, turn)
+    for _ in range(pv_moves_played):
+        board_after.pop()
     
     # Calculate material after horizon (only if we got some moves)
     if pv_moves_played >= 4:  # Need at least 4 plies (2 full moves) of continuation
-        material_horizon = _calculate_material(pv_board, board.turn)
-        
         # If material returns to within 1 point, it's a trade, not sacrifice
         if material_horizon >= material_before - 1:
             return False
@@ -363,27 +389,21 @@ def _is_brilliant_move(
         if material_before - material_horizon < BRILLIANT_MIN_SACRIFICE:
             return False
     else:
-        # If we can't verify with PV, require immediate material loss to be significant
-        if material_before - material_immediate < BRILLIANT_MIN_SACRIFICE:
+        # If we can't verify with PV, require the exchange loss to be significant
+        if -exchange < BRILLIANT_MIN_SACRIFICE:
             return False
     
     # C) Deeper confirmation: re-evaluate with higher depth
     try:
-        deeper_eval = engine.evaluate(board_after, depth=(eval_user.depth + 5))
+        deeper_eval = _evaluate_cached(engine, board_after, eval_user.depth + 5)
         
         if deeper_eval.score_cp is not None and eval_best.score_cp is not None:
-            # Convert to moving player's perspective
-            if board.turn == chess.WHITE:
-                score_best = eval_best.score_cp
-                score_deeper = deeper_eval.score_cp
-            else:
-                score_best = -eval_best.score_cp
-                score_deeper = -deeper_eval.score_cp
-            
-            # Deeper eval must remain within BRILLIANT_MARGIN of best
-            if score_deeper < score_best - BRILLIANT_MARGIN:
+            # Deeper eval must remain within BRILLIANT_MARGIN of best, from
+            # the moving player's perspective
+            sign = 1 if turn == chess.WHITE else -1
+            if (deeper_eval.score_cp - eval_best.score_cp) * sign < -BRILLIANT_MARGIN:
                 return False
-    except:
+    except EngineAnalysisError:
         # If deeper eval fails, reject brilliant
         return False
     
@@ -402,22 +422,87 @@ def _is_recapture(move: chess.Move, board: chess.Board) -> bool:
         True if move recaptures on the square of the last capture
     """
     # Check if there was a previous move
-    if len(board.move_stack) == 0:
+    if not board.move_stack:
         return False
     
-    # Get last move
+    # Check if current move captures on the square the last move went to
     last_move = board.peek()
+    if move.to_square != last_move.to_square or board.piece_at(move.to_square) is None:
+        return False
     
-    # Check if last move was a capture
-    board_before_last = board.copy()
-    board_before_last.pop()
-    was_capture = board_before_last.piece_at(last_move.to_square) is not None
+    # Check if last move was a capture, undoing it in place rather than
+    # copying the board
+    board.pop()
+    try:
+        return board.is_capture(last_move)
+    finally:
+        board.push(last_move)
+
+
+def _see(board: chess.Board, move: chess.Move) -> int:
+    """
+    Static exchange evaluation of a move.
     
-    if not was_capture:
-        return False
+    Plays out the captures on the move's target square, each side always
+    recapturing with its least valuable piece and stopping when further
+    captures would lose material. Pins are ignored; pieces behind a
+    capturing slider join in once it has moved.
     
-    # Check if current move recaptures on same square
-    return move.to_square == last_move.to_square and board.piece_at(move.to_square) is not None
+    Args:
+        board: Board before the move
+        move: Move to evaluate
+        
+    Returns:
+        Material won (negative: lost) by the side making the move
+    """
+    to_square = move.to_square
+    occupied = board.occupied & ~chess.BB_SQUARES[move.from_square]
+    
+    if board.is_en_passant(move):
+        captured_value = _PIECE_VALUES[chess.PAWN]
+        occupied &= ~chess.BB_SQUARES[to_square - 8 if board.turn == chess.WHITE else to_square + 8]
+    else:
+        captured_value = _PIECE_VALUES[board.piece_type_at(to_square) or 0]
+    
+    if move.promotion:
+        captured_value += _PIECE_VALUES[move.promotion] - _PIECE_VALUES[chess.PAWN]
+        piece_value = _PIECE_VALUES[move.promotion]
+    else:
+        piece_value = _see_value(board.piece_type_at(move.from_square))
+    
+    # gains[i]: material won by the side capturing i-th, if it may stop there
+    gains = [captured_value]
+    side = not board.turn
+    
+    while True:
+        attackers = board.attackers_mask(side, to_square, occupied) & occupied
+        if not attackers:
+            break
+        
+        for piece_type in _SEE_ORDER:
+            candidates = attackers & board.pieces_mask(piece_type, side)
+            if candidates:
+                break
+        
+        gains.append(piece_value - gains[-1])
+        piece_value = _see_value(piece_type)
+        occupied &= ~chess.BB_SQUARES[chess.lsb(candidates)]
+        side = not side
+    
+    # Each side only continues the exchange when that does not lose material
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    
+    return gains[0]
+
+
+# Attackers in the order they join an exchange, cheapest first
+_SEE_ORDER = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+
+
+def _see_value(piece_type: chess.PieceType) -> int:
+    """Value of a piece standing on the exchange square; the king cannot be given up."""
+    return 100 if piece_type == chess.KING else _PIECE_VALUES[piece_type]
 
 
 def _calculate_material(board: chess.Board, side: chess.Color) -> int:
@@ -431,25 +516,15 @@ def _calculate_material(board: chess.Board, side: chess.Color) -> int:
     Returns:
         Total material value
     """
-    material = 0
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece and piece.color == side:
-            material += _get_piece_value(piece.piece_type)
-    return material
-
-
-def _get_piece_value(piece_type: chess.PieceType) -> int:
-    """Get approximate piece value."""
-    values = {
-        chess.PAWN: 1,
-        chess.KNIGHT: 3,
-        chess.BISHOP: 3,
-        chess.ROOK: 5,
-        chess.QUEEN: 9,
-        chess.KING: 0
-    }
-    return values.get(piece_type, 0)
+    # Count each piece type on its bitboard; kings are worth nothing
+    side_mask = board.occupied_co[side]
+    return (
+        (board.pawns & side_mask).bit_count() * _PIECE_VALUES[chess.PAWN]
+        + (board.knights & side_mask).bit_count() * _PIECE_VALUES[chess.KNIGHT]
+        + (board.bishops & side_mask).bit_count() * _PIECE_VALUES[chess.BISHOP]
+        + (board.rooks & side_mask).bit_count() * _PIECE_VALUES[chess.ROOK]
+        + (board.queens & side_mask).bit_count() * _PIECE_VALUES[chess.QUEEN]
+    )
 
 
 def _classify_mate_situation(
@@ -473,42 +548,23 @@ def _classify_mate_situation(
     Returns:
         Classification if in mate situation, None otherwise
     """
+    # Mate scores are from White's perspective; the sign turns them into
+    # the moving player's, positive when the mover is the one mating
+    sign = 1 if side_to_move == chess.WHITE else -1
+    best_mate = eval_best.score_mate
+    user_mate = eval_user.score_mate
+    
     # Best move leads to mate (we had forced mate available)
-    if eval_best.score_mate is not None and eval_best.score_mate > 0:
-        # From moving player's perspective
-        if side_to_move == chess.WHITE:
-            mate_for_us = eval_best.score_mate > 0
-        else:
-            mate_for_us = eval_best.score_mate < 0
-        
-        if mate_for_us:
-            # We could have forced mate
-            # Check if user move also leads to mate
-            if eval_user.score_mate is not None:
-                if side_to_move == chess.WHITE:
-                    user_mate = eval_user.score_mate > 0
-                else:
-                    user_mate = eval_user.score_mate < 0
-                
-                if user_mate:
-                    # User found mate too (may be different line)
-                    return MoveClassification.BEST
-                else:
-                    # User move allowed opponent mate
-                    return MoveClassification.CRITICAL
-            else:
-                # User move doesn't lead to mate, missed the forced mate
-                return MoveClassification.CRITICAL
+    if best_mate is not None and best_mate * sign > 0:
+        if user_mate is not None and user_mate * sign > 0:
+            # User found mate too (may be different line)
+            return MoveClassification.BEST
+        # User move missed the forced mate, or even allowed opponent mate
+        return MoveClassification.CRITICAL
     
     # User move allows mate for opponent
-    if eval_user.score_mate is not None:
-        if side_to_move == chess.WHITE:
-            opponent_has_mate = eval_user.score_mate < 0
-        else:
-            opponent_has_mate = eval_user.score_mate > 0
-        
-        if opponent_has_mate:
-            # We gave opponent forced mate
-            return MoveClassification.BLUNDER
+    if user_mate is not None and user_mate * sign < 0:
+        # We gave opponent forced mate
+        return MoveClassification.BLUNDER
     
     return None
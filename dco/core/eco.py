@@ -3,9 +3,11 @@ ECO (Encyclopedia of Chess Openings) detection for DCO.
 Identifies opening names and codes from move sequences.
 """
 
+import functools
 import json
 import os
-from typing import Optional, Dict, Tuple
+import sys
+from typing import Optional, Dict, List, Tuple
 import chess
 
 
@@ -14,7 +16,14 @@ class ECODetector:
     
     def __init__(self):
         """Initialize ECO detector with opening database."""
-        self.eco_data: Dict[str, Dict] = {}
+        # Move sequence -> (eco, name, variation)
+        self.eco_data: Dict[str, Tuple[str, str, str]] = {}
+        
+        # SAN token -> [entry ending at this move or None, child tokens]
+        self._trie: Dict[str, list] = {}
+        
+        # Entry -> display name, formatted once at load time
+        self._display_names: Dict[Tuple[str, str, str], str] = {}
         self._load_eco_data()
     
     def _load_eco_data(self):
@@ -28,18 +37,31 @@ class ECODetector:
             with open(data_path, 'r', encoding='utf-8') as f:
                 eco_list = json.load(f)
             
-            # Build lookup dictionary keyed by move sequence
+            # Build lookup dictionary keyed by move sequence. Opening names
+            # repeat across many lines, so each distinct string is kept once.
             for entry in eco_list:
                 moves_key = entry.get('moves', '').strip()
                 if moves_key:
-                    self.eco_data[moves_key] = {
-                        'eco': entry.get('eco', ''),
-                        'name': entry.get('name', ''),
-                        'variation': entry.get('variation', '')
-                    }
+                    self.eco_data[moves_key] = (
+                        sys.intern(entry.get('eco', '')),
+                        sys.intern(entry.get('name', '')),
+                        sys.intern(entry.get('variation', ''))
+                    )
         except Exception as e:
             print(f"Warning: Could not load ECO data: {e}")
             self.eco_data = {}
+        
+        self._trie = {}
+        for moves_key, entry in self.eco_data.items():
+            children = self._trie
+            for san in moves_key.split():
+                node = children.setdefault(san, [None, {}])
+                children = node[1]
+            node[0] = entry
+        
+        self._display_names = {
+            entry: _format_display_name(*entry) for entry in self.eco_data.values()
+        }
     
     def detect_opening(
         self, 
@@ -69,26 +91,43 @@ class ECODetector:
             moves_san.append(san)
             temp_board.push(move)
         
-        # Try longest-prefix matching
-        best_match = None
-        best_match_length = 0
+        return self.detect_opening_san(moves_san, max_plies)
+    
+    def detect_opening_san(
+        self,
+        moves_san: List[str],
+        max_plies: int = 20
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Detect opening from the SAN moves of a game from the standard start.
+        
+        Lets callers that already have the SAN moves skip replaying the game.
         
-        # Start with full sequence and work backwards
-        for length in range(len(moves_san), 0, -1):
-            prefix = ' '.join(moves_san[:length])
+        Args:
+            moves_san: Moves of the game in SAN, first move first
+            max_plies: Maximum number of plies to consider for opening
             
-            if prefix in self.eco_data:
-                if length > best_match_length:
-                    best_match = self.eco_data[prefix]
-                    best_match_length = length
-                    break  # Found longest match
+        Returns:
+            Tuple of (eco_code, opening_name, variation) or (None, None, None)
+        """
+        if not self.eco_data:
+            return None, None, None
+        
+        # Walk the trie move by move; the last entry passed is the
+        # longest ECO line the game starts with
+        best_match = None
+        children = self._trie
+        
+        for san in moves_san[:max_plies]:
+            node = children.get(san)
+            if node is None:
+                break
+            entry, children = node
+            if entry is not None:
+                best_match = entry
         
         if best_match:
-            return (
-                best_match.get('eco'),
-                best_match.get('name'),
-                best_match.get('variation')
-            )
+            return best_match
         
         return None, None, None
     
@@ -101,6 +140,9 @@ class ECODetector:
         """
         Format opening information for display.
         
+        Openings from the ECO data are formatted once when it is loaded;
+        anything else is formatted on each call.
+        
         Args:
             eco: ECO code (e.g., "C50")
             name: Opening name (e.g., "Italian Game")
@@ -109,40 +151,46 @@ class ECODetector:
         Returns:
             Formatted string like "C50: Italian Game, Giuoco Piano"
         """
-        if not eco and not name:
-            return ""
-        
-        parts = []
-        
-        if eco:
-            parts.append(eco)
-        
-        if name:
-            parts.append(name)
-        
-        if variation:
-            parts.append(variation)
-        
-        # Format as "ECO: Name, Variation" or "ECO: Name" or just "Name"
-        if len(parts) == 0:
-            return ""
-        elif len(parts) == 1:
-            return parts[0]
-        elif eco and name and variation:
-            return f"{eco}: {name}, {variation}"
-        elif eco and name:
-            return f"{eco}: {name}"
-        else:
-            return ", ".join(parts)
+        display_name = self._display_names.get((eco, name, variation))
+        if display_name is None:
+            display_name = _format_display_name(eco, name, variation)
+        return display_name
 
 
-# Global ECO detector instance
-_eco_detector = None
+def _format_display_name(
+    eco: Optional[str],
+    name: Optional[str],
+    variation: Optional[str]
+) -> str:
+    """Format opening information for display; see get_opening_display_name()."""
+    if not eco and not name:
+        return ""
+    
+    parts = []
+    
+    if eco:
+        parts.append(eco)
+    
+    if name:
+        parts.append(name)
+    
+    if variation:
+        parts.append(variation)
+    
+    # Format as "ECO: Name, Variation" or "ECO: Name" or just "Name"
+    if len(parts) == 0:
+        return ""
+    elif len(parts) == 1:
+        return parts[0]
+    elif eco and name and variation:
+        return f"{eco}: {name}, {variation}"
+    elif eco and name:
+        return f"{eco}: {name}"
+    else:
+        return ", ".join(parts)
 
 
+@functools.lru_cache(maxsize=None)
 def get_eco_detector() -> ECODetector:
-    """Get global ECO detector instance (singleton)."""
-    global _eco_detector
-    if _eco_detector is None:
-        _eco_detector = ECODetector()
-    return _eco_detector
+    """Get global ECO detector instance (singleton), created on first use."""
+    return ECODetector()
@@ -3,16 +3,31 @@ Chess engine integration for DCO.
 Handles communication with Stockfish using python-chess.
 """
 
+import functools
 import os
 import shutil
 import glob
-from typing import Optional, List, Tuple
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, List, Tuple
+from dataclasses import dataclass, field, replace
 import chess
 import chess.engine
 from pathlib import Path
 
 
+# Stockfish's default Skill Level, playing at full strength
+MAX_SKILL_LEVEL = 20
+
+# Idle processes kept warm per engine path, thread count and hash size;
+# each holds its hash table, so any more are quit when released
+MAX_IDLE_PROCESSES = 2
+
+
+class EngineAnalysisError(RuntimeError):
+    """The engine failed while analysing a position."""
+
+
 @dataclass
 class EngineConfig:
     """Configuration for the chess engine."""
@@ -48,6 +63,152 @@ class EngineEvaluation:
     best_move: Optional[chess.Move]
     pv_lines: List[List[chess.Move]]  # Principal variations
     depth: int
+    # Centipawn score of each line in pv_lines (White's perspective, None for mate)
+    pv_scores: List[Optional[int]] = field(default_factory=list)
+
+
+@functools.lru_cache(maxsize=1)
+def _discover_stockfish_path() -> Optional[str]:
+    """Search the system for a Stockfish executable; see ChessEngine._find_stockfish()."""
+    # Common executable names for Stockfish
+    exe_names = ['stockfish', 'stockfish.exe', 'stockfish_x64.exe', 'stockfish_x64_popcnt.exe']
+    
+    # 1. Check if stockfish is in PATH
+    for name in exe_names:
+        path = shutil.which(name)
+        if path:
+            return path
+    
+    # 2. Check common Windows installation directories
+    common_windows_paths = [
+        r"C:\Program Files\Stockfish\stockfish.exe",
+        r"C:\Program Files\Stockfish\stockfish_x64.exe",
+        r"C:\Program Files (x86)\Stockfish\stockfish.exe",
+        os.path.expanduser("~\\AppData\\Local\\Stockfish\\stockfish.exe"),
+        os.path.expanduser("~\\AppData\\Local\\Stockfish\\stockfish_x64.exe"),
+        os.path.expanduser("~\\Stockfish\\stockfish.exe"),
+    ]
+    
+    for path in common_windows_paths:
+        if os.path.exists(path):
+            return path
+    
+    # 3. Check Downloads folder
+    downloads_path = os.path.expanduser("~\\Downloads")
+    if os.path.exists(downloads_path):
+        for pattern in ["stockfish*.exe", "stockfish"]:
+            matches = glob.glob(os.path.join(downloads_path, "**", pattern), recursive=True)
+            if matches:
+                return os.path.abspath(matches[0])
+    
+    # 4. Check macOS common paths
+    macos_paths = [
+        "/usr/local/bin/stockfish",
+        "/opt/homebrew/bin/stockfish",
+        os.path.expanduser("~/stockfish/src/stockfish"),
+    ]
+    
+    for path in macos_paths:
+        if os.path.exists(path):
+            return path
+    
+    # 5. Check Linux common paths
+    linux_paths = [
+        "/usr/bin/stockfish",
+        "/usr/local/bin/stockfish",
+        os.path.expanduser("~/stockfish/src/stockfish"),
+    ]
+    
+    for path in linux_paths:
+        if os.path.exists(path):
+            return path
+    
+    return None
+
+
+def _quit_engine(engine: chess.engine.SimpleEngine) -> None:
+    """Quit an engine process, ignoring one that has already gone."""
+    try:
+        engine.quit()
+    except (chess.engine.EngineError, TimeoutError):
+        pass
+
+
+class _EngineProcessPool:
+    """
+    Idle Stockfish processes kept warm between ChessEngine sessions.
+    
+    Starting Stockfish (process start, UCI handshake, hash allocation) costs
+    far more than a short analysis. ChessEngine.stop() therefore hands its
+    process back here, and the next start() with the same path, threads and
+    hash size takes it instead of spawning a new one.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, int, int], List[chess.engine.SimpleEngine]] = {}
+        self._pid = os.getpid()
+        self._closer: Optional[threading.Thread] = None
+    
+    def acquire(self, key: Tuple[str, int, int]) -> Optional[chess.engine.SimpleEngine]:
+        """Take an idle process started with the given settings, if any."""
+        with self._lock:
+            self._forget_inherited()
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+    
+    def release(self, key: Tuple[str, int, int], engine: chess.engine.SimpleEngine) -> None:
+        """Keep a process for reuse, unless it no longer responds or enough are kept."""
+        try:
+            engine.ping()
+        except (chess.engine.EngineError, TimeoutError):
+            _quit_engine(engine)
+            return
+        with self._lock:
+            self._forget_inherited()
+            idle = self._idle.setdefault(key, [])
+            kept = len(idle) < MAX_IDLE_PROCESSES
+            if kept:
+                idle.append(engine)
+                if self._closer is None:
+                    self._closer = threading.Thread(
+                        target=self._close_at_exit, name="engine-pool-closer", daemon=True
+                    )
+                    self._closer.start()
+        
+        # Enough processes with these settings are kept already
+        if not kept:
+            _quit_engine(engine)
+    
+    def close(self) -> None:
+        """Quit every idle process."""
+        with self._lock:
+            self._forget_inherited()
+            idle, self._idle = self._idle, {}
+        for engines in idle.values():
+            for engine in engines:
+                _quit_engine(engine)
+    
+    def _close_at_exit(self) -> None:
+        """
+        Quit the idle processes once the main thread has finished.
+        
+        Each engine runs its event loop in a non-daemon thread, and the
+        interpreter waits for those before it runs atexit handlers, so an
+        atexit handler would never get to quit them.
+        """
+        threading.main_thread().join()
+        self.close()
+    
+    def _forget_inherited(self) -> None:
+        """Drop processes inherited through fork; they belong to the parent."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = {}
+            self._closer = None
+
+
+_engine_processes = _EngineProcessPool()
 
 
 class ChessEngine:
@@ -63,6 +224,15 @@ class ChessEngine:
         self.config = config or EngineConfig()
         self.engine: Optional[chess.engine.SimpleEngine] = None
         
+        # Identifies the game being analysed; see new_game()
+        self._game_key: Optional[object] = None
+        
+        # Settings the running process was started with; see start()
+        self._process_key: Optional[Tuple[str, int, int]] = None
+        
+        # Skill Level the running process is set to; see _set_skill_level()
+        self._current_skill = MAX_SKILL_LEVEL
+        
         # Auto-detect engine path if not provided
         if not self.config.path:
             self.config.path = self._find_stockfish()
@@ -72,63 +242,16 @@ class ChessEngine:
         Try to find Stockfish executable on the system.
         Searches in PATH, common installation directories, and user-provided paths.
         
+        The search runs once per process; only a failed search is repeated,
+        in case Stockfish has been installed since.
+        
         Returns:
             Path to Stockfish executable, or None if not found
         """
-        # Common executable names for Stockfish
-        exe_names = ['stockfish', 'stockfish.exe', 'stockfish_x64.exe', 'stockfish_x64_popcnt.exe']
-        
-        # 1. Check if stockfish is in PATH
-        for name in exe_names:
-            path = shutil.which(name)
-            if path:
-                return path
-        
-        # 2. Check common Windows installation directories
-        common_windows_paths = [
-            r"C:\Program Files\Stockfish\stockfish.exe",
-            r"C:\Program Files\Stockfish\stockfish_x64.exe",
-            r"C:\Program Files (x86)\Stockfish\stockfish.exe",
-            os.path.expanduser("~\\AppData\\Local\\Stockfish\\stockfish.exe"),
-            os.path.expanduser("~\\AppData\\Local\\Stockfish\\stockfish_x64.exe"),
-            os.path.expanduser("~\\Stockfish\\stockfish.exe"),
-        ]
-        
-        for path in common_windows_paths:
-            if os.path.exists(path):
-                return path
-        
-        # 3. Check Downloads folder
-        downloads_path = os.path.expanduser("~\\Downloads")
-        if os.path.exists(downloads_path):
-            for pattern in ["stockfish*.exe", "stockfish"]:
-                matches = glob.glob(os.path.join(downloads_path, "**", pattern), recursive=True)
-                if matches:
-                    return os.path.abspath(matches[0])
-        
-        # 4. Check macOS common paths
-        macos_paths = [
-            "/usr/local/bin/stockfish",
-            "/opt/homebrew/bin/stockfish",
-            os.path.expanduser("~/stockfish/src/stockfish"),
-        ]
-        
-        for path in macos_paths:
-            if os.path.exists(path):
-                return path
-        
-        # 5. Check Linux common paths
-        linux_paths = [
-            "/usr/bin/stockfish",
-            "/usr/local/bin/stockfish",
-            os.path.expanduser("~/stockfish/src/stockfish"),
-        ]
-        
-        for path in linux_paths:
-            if os.path.exists(path):
-                return path
-        
-        return None
+        path = _discover_stockfish_path()
+        if path is None:
+            _discover_stockfish_path.cache_clear()
+        return path
     
     def start(self) -> bool:
         """
@@ -159,6 +282,17 @@ class ChessEngine:
         if not os.path.exists(self.config.path):
             raise RuntimeError(f"Stockfish not found at: {self.config.path}")
         
+        # Reuse a process left by an earlier session with the same settings,
+        # clearing its hash table before the first search. Threads and Hash
+        # are part of the key, so a reused process needs no configuring.
+        # Pooled and new processes both play at full strength.
+        self._process_key = (self.config.path, self.config.threads, self.config.hash_mb)
+        self._current_skill = MAX_SKILL_LEVEL
+        self.engine = _engine_processes.acquire(self._process_key)
+        if self.engine:
+            self.new_game()
+            return True
+        
         try:
             self.engine = chess.engine.SimpleEngine.popen_uci(self.config.path)
             
@@ -173,14 +307,39 @@ class ChessEngine:
             raise RuntimeError(f"Failed to start Stockfish: {str(e)}")
     
     def stop(self):
-        """Stop the chess engine."""
+        """Stop the chess engine, keeping its process warm for the next start()."""
         if self.engine:
-            try:
-                self.engine.quit()
-            except:
-                pass
-            finally:
-                self.engine = None
+            engine, self.engine = self.engine, None
+            
+            # Pooled processes are kept at full strength
+            if self._current_skill != MAX_SKILL_LEVEL:
+                try:
+                    engine.configure({"Skill Level": MAX_SKILL_LEVEL})
+                except chess.engine.EngineError:
+                    _quit_engine(engine)
+                    return
+            _engine_processes.release(self._process_key, engine)
+    
+    @staticmethod
+    def close_pool():
+        """Quit the Stockfish processes kept warm by stop()."""
+        _engine_processes.close()
+    
+    def new_game(self):
+        """
+        Mark the start of a new game.
+        
+        The next search sends ucinewgame, so the engine clears its hash table
+        and its searches do not inherit entries from earlier games. Later
+        searches until the next call send it no more.
+        
+        This does not make a game's analysis independent of earlier games:
+        GameAnalyzer reuses evaluations of positions that earlier games
+        reached (see its eval_cache_size), trading exact reproducibility
+        for not searching common positions again. An analyzer created with
+        eval_cache_size=0 analyses every game from scratch.
+        """
+        self._game_key = object()
     
     def evaluate(
         self, 
@@ -202,22 +361,66 @@ class ChessEngine:
         if not self.engine:
             self.start()
         
-        # Determine analysis limit
-        if time_limit is not None:
-            limit = chess.engine.Limit(time=time_limit)
-        elif depth is not None:
-            limit = chess.engine.Limit(depth=depth)
-        elif self.config.time_per_move is not None:
-            limit = chess.engine.Limit(time=self.config.time_per_move)
-        else:
-            limit = chess.engine.Limit(depth=self.config.depth or 20)
+        return self._analyse(board, self._analysis_limit(depth, time_limit))
+    
+    def evaluate_positions(
+        self,
+        boards: Iterable[chess.Board],
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None
+    ) -> List[EngineEvaluation]:
+        """
+        Evaluate a batch of positions back-to-back on the running engine.
         
+        The search limit is resolved once and every position is sent to the
+        same warm engine process. python-chess serializes UCI commands (a new
+        command cancels the one in flight), so positions are searched one
+        after another rather than pipelined.
+        
+        Each board is analysed before the next one is taken from boards, so
+        a generator may yield one board that it updates in place.
+        
+        Args:
+            boards: Chess boards to evaluate
+            depth: Search depth (uses config default if None)
+            time_limit: Time limit in seconds (uses config default if None)
+            
+        Returns:
+            One EngineEvaluation per board, in the same order
+        """
+        if not self.engine:
+            self.start()
+        
+        limit = self._analysis_limit(depth, time_limit)
+        return [self._analyse(board, limit) for board in boards]
+    
+    def _analysis_limit(
+        self,
+        depth: Optional[int],
+        time_limit: Optional[float]
+    ) -> chess.engine.Limit:
+        """Determine the analysis limit from arguments and config defaults."""
+        if time_limit is not None:
+            return chess.engine.Limit(time=time_limit)
+        if depth is not None:
+            return chess.engine.Limit(depth=depth)
+        if self.config.time_per_move is not None:
+            return chess.engine.Limit(time=self.config.time_per_move)
+        return chess.engine.Limit(depth=self.config.depth or 20)
+    
+    def _analyse(self, board: chess.Board, limit: chess.engine.Limit) -> EngineEvaluation:
+        """Run one analysis and convert the engine output to an EngineEvaluation."""
         # Analyze position
-        info = self.engine.analyse(
-            board, 
-            limit,
-            multipv=self.config.multipv
-        )
+        try:
+            self._set_skill_level(MAX_SKILL_LEVEL)
+            info = self.engine.analyse(
+                board, 
+                limit,
+                multipv=self.config.multipv,
+                game=self._game_key
+            )
+        except (chess.engine.EngineError, TimeoutError) as e:
+            raise EngineAnalysisError(f"Analysis failed: {e}") from e
         
         # Extract primary evaluation
         primary_info = info if isinstance(info, dict) else info[0]
@@ -237,22 +440,21 @@ class ChessEngine:
         best_move = primary_info.get("pv", [None])[0]
         
         pv_lines = []
-        if isinstance(info, list):
-            for item in info:
-                pv = item.get("pv", [])
-                if pv:
-                    pv_lines.append(pv)
-        else:
-            pv = primary_info.get("pv", [])
+        pv_scores = []
+        for item in (info if isinstance(info, list) else [info]):
+            pv = item.get("pv", [])
             if pv:
                 pv_lines.append(pv)
+                line_score = item.get("score")
+                pv_scores.append(line_score.white().score() if line_score else None)
         
         return EngineEvaluation(
             score_cp=score_cp,
             score_mate=score_mate,
             best_move=best_move,
             pv_lines=pv_lines,
-            depth=primary_info.get("depth", 0)
+            depth=primary_info.get("depth", 0),
+            pv_scores=pv_scores
         )
     
     def get_best_move(
@@ -295,9 +497,9 @@ class ChessEngine:
         if not self.engine:
             self.start()
         
-        # Configure skill level if specified
-        if skill_level is not None:
-            self.engine.configure({"Skill Level": skill_level})
+        # Configure skill level; it is left set for the next move, and
+        # restored to full strength before analysis and by stop()
+        self._set_skill_level(MAX_SKILL_LEVEL if skill_level is None else skill_level)
         
         # Determine time limit
         limit = chess.engine.Limit(time=time_limit or 1.0)
@@ -305,12 +507,14 @@ class ChessEngine:
         # Get move
         result = self.engine.play(board, limit)
         
-        # Reset skill level if it was set
-        if skill_level is not None:
-            self.engine.configure({"Skill Level": 20})
-        
         return result.move
     
+    def _set_skill_level(self, skill_level: int):
+        """Set the engine's Skill Level, skipping the round trip to the engine thread if unchanged."""
+        if skill_level != self._current_skill:
+            self.engine.configure({"Skill Level": skill_level})
+            self._current_skill = skill_level
+    
     def __enter__(self):
         """Context manager entry."""
         self.start()
@@ -321,21 +525,162 @@ class ChessEngine:
         self.stop()
 
 
+class EnginePool:
+    """
+    Several single-threaded engines evaluating positions side by side.
+    
+    N single-threaded Stockfish processes search independent positions faster
+    than one process with N threads. The pool can stand in for ChessEngine
+    wherever positions are evaluated in batches, e.g. in GameAnalyzer.
+    """
+    
+    def __init__(self, config: Optional[EngineConfig] = None, size: Optional[int] = None):
+        """
+        Initialize engine pool.
+        
+        Args:
+            config: Engine configuration shared by the pool; the hash budget
+                is split between the engines. If None, uses defaults.
+            size: Number of engine processes (None = CPU count)
+        """
+        self.config = config or EngineConfig()
+        self.size = max(1, size or os.cpu_count() or 1)
+        
+        member_config = replace(
+            self.config,
+            threads=1,
+            hash_mb=max(16, self.config.hash_mb // self.size)
+        )
+        self.engines = [ChessEngine(replace(member_config)) for _ in range(self.size)]
+        self.config.path = self.engines[0].config.path
+        
+        # Waits on the engine processes; the searches run outside Python
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def start(self) -> bool:
+        """
+        Start every engine in the pool.
+        
+        Returns:
+            True if all engines started successfully
+            
+        Raises:
+            RuntimeError: If Stockfish cannot be found or started
+        """
+        try:
+            for engine in self.engines:
+                engine.start()
+        except RuntimeError:
+            self.stop()
+            raise
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size)
+        return True
+    
+    def stop(self):
+        """Stop every engine in the pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for engine in self.engines:
+            engine.stop()
+    
+    def new_game(self):
+        """Mark the start of a new game on every engine; see ChessEngine.new_game()."""
+        for engine in self.engines:
+            engine.new_game()
+    
+    def evaluate(
+        self,
+        board: chess.Board,
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None
+    ) -> EngineEvaluation:
+        """Evaluate a single position on the first engine of the pool."""
+        self._sync_multipv()
+        return self.engines[0].evaluate(board, depth, time_limit)
+    
+    def evaluate_positions(
+        self,
+        boards: Iterable[chess.Board],
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None
+    ) -> List[EngineEvaluation]:
+        """
+        Evaluate a batch of positions spread over the engines of the pool.
+        
+        Each engine gets one contiguous run of the batch, so neighbouring
+        positions still share a hash table and the split (and with it the
+        result) depends only on the batch and the pool size.
+        
+        Args:
+            boards: Chess boards to evaluate; copied with their move
+                history (which the engine needs for repetitions and the
+                fifty-move rule), so a generator may yield one board that
+                it updates in place
+            depth: Search depth (uses config default if None)
+            time_limit: Time limit in seconds (uses config default if None)
+            
+        Returns:
+            One EngineEvaluation per board, in the same order
+        """
+        boards = [board.copy() for board in boards]
+        if not boards:
+            return []
+        
+        self.start()
+        self._sync_multipv()
+        
+        chunk = -(-len(boards) // self.size)
+        futures = [
+            self._executor.submit(engine.evaluate_positions, boards[i:i + chunk], depth, time_limit)
+            for engine, i in zip(self.engines, range(0, len(boards), chunk))
+        ]
+        return [evaluation for future in futures for evaluation in future.result()]
+    
+    def _sync_multipv(self):
+        """Apply the pool's MultiPV setting, which callers may change, to every engine."""
+        for engine in self.engines:
+            engine.config.multipv = self.config.multipv
+    
+    def get_best_move(
+        self,
+        board: chess.Board,
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None
+    ) -> Optional[chess.Move]:
+        """Get the best move for a position from the first engine of the pool."""
+        return self.evaluate(board, depth, time_limit).best_move
+    
+    def __enter__(self):
+        """Context manager entry."""
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
+
+
+# Rough mapping: 1000 Elo = skill 0, 3200 Elo = skill 20, by linear
+# interpolation. Both directions are tabulated once, indexed by the clamped
+# Elo (offset by 1000) and skill level.
+_ELO_TO_SKILL = tuple(int((elo - 1000) / (3200 - 1000) * 20) for elo in range(1000, 3201))
+_SKILL_TO_ELO = tuple(1000 + int(skill / 20 * (3200 - 1000)) for skill in range(21))
+
+
 def elo_to_skill_level(elo: int) -> int:
     """
     Convert Elo rating to Stockfish skill level (0-20).
     
     Args:
-        elo: Elo rating (1000-3200)
+        elo: Elo rating (1000-3200); a float is truncated first
         
     Returns:
         Skill level (0-20)
     """
-    # Rough mapping: 1000 Elo = skill 0, 3200 Elo = skill 20
-    # Linear interpolation
-    elo = max(1000, min(3200, elo))
-    skill = int((elo - 1000) / (3200 - 1000) * 20)
-    return max(0, min(20, skill))
+    return _ELO_TO_SKILL[max(1000, min(3200, int(elo))) - 1000]
 
 
 def skill_level_to_elo(skill: int) -> int:
@@ -343,11 +688,11 @@ def skill_level_to_elo(skill: int) -> int:
     Convert Stockfish skill level to approximate Elo rating.
     
     Args:
-        skill: Skill level (0-20)
+        skill: Skill level (0-20); a float is truncated first, as UCI
+            skill levels are whole numbers
         
     Returns:
         Approximate Elo rating
     """
-    skill = max(0, min(20, skill))
-    elo = 1000 + int(skill / 20 * (3200 - 1000))
-    return elo
+    return _SKILL_TO_ELO[max(0, min(20, int(skill)))]
+
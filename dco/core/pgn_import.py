@@ -4,13 +4,33 @@ Handles importing chess games from PGN format.
 """
 
 from datetime import datetime
-from typing import List, Optional, Tuple
+from itertools import chain, islice
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple, Union
 import chess.pgn
 import io
+import multiprocessing
+import os
+from sqlalchemy import insert, tuple_
 from sqlalchemy.orm import Session
 
 from ..data.models import Game, GameSource
 
+# Games looked up per duplicate query; three bound parameters each, well
+# below SQLite's limit on parameters per statement
+DUPLICATE_QUERY_BATCH = 300
+
+# Games parsed, checked and committed together, bounding both memory use
+# and transaction size for large PGN files
+IMPORT_BATCH_SIZE = 1000
+
+# Read buffer for PGN files
+FILE_BUFFER_SIZE = 1 << 20
+
+# Bytes of a PGN file parsed per worker task. Files that fit in one chunk
+# are parsed in this process, as starting workers would cost more than
+# they save.
+PARSE_CHUNK_SIZE = 4 << 20
+
 
 class PGNImporter:
     """Handles importing games from PGN format."""
@@ -39,176 +59,323 @@ class PGNImporter:
         Returns:
             Tuple of (imported_games, error_messages)
         """
-        imported = []
-        errors = []
-        
-        # Parse PGN text
-        pgn_io = io.StringIO(pgn_text)
-        
-        while True:
-            try:
-                game = chess.pgn.read_game(pgn_io)
-                if game is None:
-                    break
-                
-                # Extract game data
-                headers = game.headers
-                
-                # Check for duplicate
-                if skip_duplicates:
-                    if self._is_duplicate(headers, game):
-                        errors.append(
-                            f"Skipped duplicate: {headers.get('White', '?')} vs "
-                            f"{headers.get('Black', '?')} on {headers.get('Date', '?')}"
-                        )
-                        continue
-                
-                # Create Game object
-                db_game = self._create_game_from_pgn(game, headers, pgn_text)
-                
-                # Add to session
-                self.session.add(db_game)
-                imported.append(db_game)
-                
-            except Exception as e:
-                errors.append(f"Error parsing game: {str(e)}")
-                continue
-        
-        # Commit all imported games
-        if imported:
-            try:
-                self.session.commit()
-            except Exception as e:
-                self.session.rollback()
-                errors.append(f"Error saving games to database: {str(e)}")
-                return [], errors
-        
-        return imported, errors
+        return self._import_parsed(_parse_games(io.StringIO(pgn_text)), skip_duplicates)
     
     def import_pgn_file(
         self, 
         file_path: str, 
-        skip_duplicates: bool = True
+        skip_duplicates: bool = True,
+        workers: Optional[int] = None
     ) -> Tuple[List[Game], List[str]]:
         """
         Import games from a PGN file.
         
+        The file is parsed as it is read rather than loaded whole, so
+        large database dumps can be imported. Files larger than
+        PARSE_CHUNK_SIZE are split at game boundaries and the chunks are
+        parsed by worker processes, while this process saves the games.
+        
         Args:
             file_path: Path to PGN file
             skip_duplicates: If True, skip games that appear to be duplicates
+            workers: Number of parsing processes (None = CPU count)
             
         Returns:
             Tuple of (imported_games, error_messages)
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                pgn_text = f.read()
-            return self.import_pgn_text(pgn_text, skip_duplicates)
+            chunks = _split_pgn_boundaries(file_path)
+            workers = min(workers or os.cpu_count() or 1, len(chunks))
+            if workers > 1:
+                return self._import_parsed(_parse_chunks(chunks, workers), skip_duplicates)
+            
+            with open(file_path, 'r', encoding='utf-8', buffering=FILE_BUFFER_SIZE) as f:
+                return self._import_parsed(_parse_games(f), skip_duplicates)
         except Exception as e:
             return [], [f"Error reading file: {str(e)}"]
     
-    def _create_game_from_pgn(
-        self, 
-        game: chess.pgn.Game, 
-        headers: chess.pgn.Headers,
-        original_pgn: str
-    ) -> Game:
+    def _import_parsed(
+        self,
+        parsed_games: Iterator[Union[Dict[str, Any], str]],
+        skip_duplicates: bool
+    ) -> Tuple[List[Game], List[str]]:
         """
-        Create a Game model instance from a chess.pgn.Game object.
+        Import parsed games, committing every IMPORT_BATCH_SIZE games.
         
         Args:
-            game: chess.pgn.Game object
-            headers: Game headers
-            original_pgn: Original PGN text
+            parsed_games: Game column values or parse error messages, in
+                PGN order (see _parse_games)
+            skip_duplicates: If True, skip games that appear to be duplicates
             
         Returns:
-            Game model instance
+            Tuple of (imported_games, error_messages). If saving a batch
+            fails, the games of earlier, already committed batches are
+            returned along with the error.
         """
-        # Extract moves in SAN notation
-        board = game.board()
-        moves_san = []
-        for move in game.mainline_moves():
-            moves_san.append(board.san(move))
-            board.push(move)
-        
-        # Parse Elo ratings (handle '?' and invalid values)
-        def parse_elo(elo_str: Optional[str]) -> Optional[int]:
-            if not elo_str or elo_str == '?':
-                return None
+        imported: List[Game] = []
+        errors: List[str] = []
+        seen: Set[Tuple[str, str, str, str]] = set()
+        
+        while True:
+            # Parse a batch of games first, so that possible duplicates can
+            # be looked up in the database together
+            parsed = list(islice(parsed_games, IMPORT_BATCH_SIZE))
+            if not parsed:
+                return imported, errors
+            
+            if skip_duplicates:
+                seen.update(self._existing_duplicate_keys(
+                    [row for row in parsed if not isinstance(row, str)]
+                ))
+            
+            rows = []
+            for row in parsed:
+                if isinstance(row, str):
+                    errors.append(row)
+                    continue
+                
+                # Check for duplicate, of a stored game or one imported
+                # earlier from the same text
+                if skip_duplicates:
+                    key = _duplicate_key(row['white'], row['black'], row['date'], row['moves_san'])
+                    if key in seen:
+                        errors.append(
+                            f"Skipped duplicate: {row['white']} vs {row['black']} on {row['date']}"
+                        )
+                        continue
+                    if key is not None:
+                        seen.add(key)
+                
+                rows.append(row)
+            
+            if not rows:
+                continue
+            
+            # Insert the batch with one multi-row INSERT ... RETURNING. Ids
+            # are assigned in input order, but RETURNING rows need not come
+            # back in that order, so sort the returned Game instances by id.
             try:
-                return int(elo_str)
-            except ValueError:
-                return None
-        
-        white_elo = parse_elo(headers.get('WhiteElo'))
-        black_elo = parse_elo(headers.get('BlackElo'))
-        
-        # Create Game instance
-        db_game = Game(
-            source=GameSource.PGN_IMPORT,
-            event=headers.get('Event', ''),
-            site=headers.get('Site', ''),
-            date=headers.get('Date', ''),
-            round=headers.get('Round', ''),
-            white=headers.get('White', ''),
-            black=headers.get('Black', ''),
-            result=headers.get('Result', '*'),
-            white_elo=white_elo,
-            black_elo=black_elo,
-            time_control=headers.get('TimeControl', ''),
-            termination=headers.get('Termination', ''),
-            pgn_text=str(game),  # Store the parsed PGN
-            moves_san=' '.join(moves_san),
-            created_at=datetime.utcnow()
-        )
-        
-        return db_game
-    
-    def _is_duplicate(
-        self, 
-        headers: chess.pgn.Headers, 
-        game: chess.pgn.Game
-    ) -> bool:
+                batch = sorted(
+                    self.session.scalars(insert(Game).returning(Game), rows),
+                    key=lambda db_game: db_game.id
+                )
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                errors.append(f"Error saving games to database: {str(e)}")
+                return imported, errors
+            
+            imported.extend(batch)
+    
+    def _existing_duplicate_keys(self, rows: List[Dict[str, Any]]) -> Set[Tuple[str, str, str, str]]:
         """
-        Check if a game is a duplicate of an existing game in the database.
+        Find the stored games that would make any of the given games a duplicate.
+        
+        A game is a duplicate of a stored game with the same players and
+        date whose first 10 moves match. All candidates are fetched by
+        players and date in a few queries rather than one query per game.
         
         Args:
-            headers: Game headers
-            game: chess.pgn.Game object
+            rows: Column values of the games about to be imported
             
         Returns:
-            True if duplicate found, False otherwise
+            Duplicate keys (see _duplicate_key) of the matching stored games
         """
-        # Extract key identifying information
-        white = headers.get('White', '')
-        black = headers.get('Black', '')
-        date = headers.get('Date', '')
-        
-        # Get first 10 moves for comparison
-        board = game.board()
-        moves = []
-        for i, move in enumerate(game.mainline_moves()):
-            if i >= 10:
-                break
-            moves.append(board.san(move))
-            board.push(move)
-        moves_start = ' '.join(moves)
-        
-        # Query for similar games
-        if white and black and date:
-            existing = self.session.query(Game).filter(
-                Game.white == white,
-                Game.black == black,
-                Game.date == date
-            ).first()
+        candidates = list({
+            (row['white'], row['black'], row['date'])
+            for row in rows
+            if row['white'] and row['black'] and row['date']
+        })
+        
+        keys = set()
+        for i in range(0, len(candidates), DUPLICATE_QUERY_BATCH):
+            rows = self.session.query(
+                Game.white, Game.black, Game.date, Game.moves_san
+            ).filter(
+                tuple_(Game.white, Game.black, Game.date).in_(candidates[i:i + DUPLICATE_QUERY_BATCH])
+            )
+            keys.update(_duplicate_key(*row) for row in rows)
+        
+        keys.discard(None)
+        return keys
+
+
+def _duplicate_key(
+    white: Optional[str],
+    black: Optional[str],
+    date: Optional[str],
+    moves_san: Optional[str]
+) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Key under which two games count as duplicates: players, date and first 10 moves.
+    
+    Returns None for games without players, date or moves, which are
+    never treated as duplicates.
+    """
+    if not (white and black and date and moves_san):
+        return None
+    return white, black, date, ' '.join(moves_san.split()[:10])
+
+
+def _parse_games(pgn_io: TextIO) -> Iterator[Union[Dict[str, Any], str]]:
+    """
+    Parse games from a PGN text stream one at a time.
+    
+    Args:
+        pgn_io: Text stream positioned at the start of the PGN
+        
+    Yields:
+        The column values of each game, or the error message for a
+        game that could not be parsed. Reading stops at the first
+        error reading the stream itself.
+    """
+    while True:
+        try:
+            game = chess.pgn.read_game(pgn_io)
+            if game is None:
+                return
+            
+            # Collect the game's column values
+            yield _game_row_from_pgn(game, game.headers)
             
-            if existing and existing.moves_san:
-                # Check if first 10 moves match
-                existing_moves_start = ' '.join(existing.moves_san.split()[:10])
-                if existing_moves_start == moves_start:
-                    return True
+        except (OSError, UnicodeDecodeError) as e:
+            yield f"Error reading file: {str(e)}"
+            return
+        except Exception as e:
+            yield f"Error parsing game: {str(e)}"
+
+
+def _split_pgn_boundaries(file_path: str) -> List[Tuple[str, int, int]]:
+    """
+    Split a PGN file into chunks of about PARSE_CHUNK_SIZE bytes.
+    
+    Chunks end where a game starts: at an [Event tag following a blank
+    line. Only a line or so is read around each boundary, not the file.
+    
+    Args:
+        file_path: Path to PGN file
+        
+    Returns:
+        (file_path, offset, length) of each chunk, in file order
+    """
+    size = os.path.getsize(file_path)
+    chunks = []
+    start = 0
+    
+    with open(file_path, 'rb') as f:
+        while start < size:
+            end = size
+            if start + PARSE_CHUNK_SIZE < size:
+                # Skip to the start of the next line, then look for a game
+                f.seek(start + PARSE_CHUNK_SIZE)
+                f.readline()
+                after_blank = False
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    if after_blank and line.startswith(b'[Event '):
+                        end = offset
+                        break
+                    after_blank = not line.strip()
+            
+            chunks.append((file_path, start, end - start))
+            start = end
+    
+    return chunks
+
+
+def _parse_chunks(
+    chunks: List[Tuple[str, int, int]],
+    workers: int
+) -> Iterator[Union[Dict[str, Any], str]]:
+    """
+    Parse PGN file chunks in worker processes.
+    
+    Args:
+        chunks: Chunks from _split_pgn_boundaries
+        workers: Number of worker processes
+        
+    Yields:
+        Game column values or error messages (see _parse_games), in file
+        order, as soon as the chunks holding them are parsed
+    """
+    # Spawned workers are safe to start from GUI worker threads
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        yield from chain.from_iterable(pool.imap(_parse_chunk, chunks, chunksize=1))
+
+
+def _parse_chunk(chunk: Tuple[str, int, int]) -> List[Union[Dict[str, Any], str]]:
+    """
+    Parse the games in one chunk of a PGN file (worker process entry point).
+    
+    Args:
+        chunk: (file_path, offset, length) from _split_pgn_boundaries
         
-        return False
+    Returns:
+        Game column values or error messages (see _parse_games)
+    """
+    file_path, offset, length = chunk
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    
+    pgn_io = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+    return list(_parse_games(pgn_io))
+
+
+def _game_row_from_pgn(
+    game: chess.pgn.Game, 
+    headers: chess.pgn.Headers
+) -> Dict[str, Any]:
+    """
+    Build the Game column values for a chess.pgn.Game object.
+    
+    Args:
+        game: chess.pgn.Game object
+        headers: Game headers
+        
+    Returns:
+        Dictionary of Game column values
+    """
+    # Extract moves in SAN notation
+    board = game.board()
+    moves_san = []
+    for move in game.mainline_moves():
+        moves_san.append(board.san(move))
+        board.push(move)
+    
+    # Parse Elo ratings (handle '?' and invalid values)
+    def parse_elo(elo_str: Optional[str]) -> Optional[int]:
+        if not elo_str or elo_str == '?':
+            return None
+        try:
+            return int(elo_str)
+        except ValueError:
+            return None
+    
+    white_elo = parse_elo(headers.get('WhiteElo'))
+    black_elo = parse_elo(headers.get('BlackElo'))
+    
+    return dict(
+        source=GameSource.PGN_IMPORT,
+        event=headers.get('Event', ''),
+        site=headers.get('Site', ''),
+        date=headers.get('Date', ''),
+        round=headers.get('Round', ''),
+        white=headers.get('White', ''),
+        black=headers.get('Black', ''),
+        result=headers.get('Result', '*'),
+        white_elo=white_elo,
+        black_elo=black_elo,
+        time_control=headers.get('TimeControl', ''),
+        termination=headers.get('Termination', ''),
+        pgn_text=str(game),  # Store the parsed PGN
+        moves_san=' '.join(moves_san),
+        created_at=datetime.utcnow()
+    )
 
 
 def import_pgn(
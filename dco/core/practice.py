@@ -14,6 +14,7 @@ import chess
 
 from .engine import ChessEngine
 from .analysis import GameAnalysisResult
+from .classification import MoveClassification
 from ..data.models import (
     Game,
     PracticeItem,
@@ -26,6 +27,14 @@ from ..data.models import (
 DEFAULT_OFFSET_PLIES = 2
 DEFAULT_TARGET_LINE_PLIES = 1
 
+# Practice category for each move classification worth practicing
+_PRACTICE_CATEGORIES = {
+    MoveClassification.BLUNDER: PracticeCategory.BLUNDER,
+    MoveClassification.MISTAKE: PracticeCategory.MISTAKE,
+    MoveClassification.INACCURACY: PracticeCategory.INACCURACY,
+    MoveClassification.CRITICAL: PracticeCategory.CRITICAL,
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -80,7 +89,7 @@ def generate_practice_items(
     created = 0
 
     for move in analysis_result.moves:
-        category = _map_move_to_category(move.classification.name)
+        category = _PRACTICE_CATEGORIES.get(move.classification)
         if category is None or category not in categories:
             continue
 
@@ -236,17 +245,6 @@ def update_practice_progress(
     progress.due_date = datetime.utcnow() + timedelta(days=progress.interval_days)
 
 
-def _map_move_to_category(classification: str) -> Optional[PracticeCategory]:
-    """Map move classification string to PracticeCategory."""
-    mapping = {
-        "BLUNDER": PracticeCategory.BLUNDER,
-        "MISTAKE": PracticeCategory.MISTAKE,
-        "INACCURACY": PracticeCategory.INACCURACY,
-        "CRITICAL": PracticeCategory.CRITICAL
-    }
-    return mapping.get(classification)
-
-
 def _build_target_line(
     board: chess.Board,
     engine: ChessEngine,
@@ -12,6 +12,7 @@ class AppSettings:
     
     def __init__(self):
         self.settings = QSettings("DCO", "DailyChessOffline")
+        self._theme: Optional[str] = None  # Cached by get_theme()
     
     # ===== Engine Settings =====
     
@@ -154,11 +155,14 @@ class AppSettings:
     
     def get_theme(self) -> str:
         """Get UI theme: 'light' or 'dark'."""
-        return self.settings.value("appearance/theme", "light")
+        if self._theme is None:
+            self._theme = self.settings.value("appearance/theme", "light")
+        return self._theme
     
     def set_theme(self, theme: str):
         """Set UI theme: 'light' or 'dark'."""
         self.settings.setValue("appearance/theme", theme)
+        self._theme = theme
     
     def get_board_light_color(self) -> str:
         """Get light square color for chess board."""
@@ -215,6 +219,11 @@ class AppSettings:
     def reset_all(self):
         """Reset all settings to defaults."""
         self.settings.clear()
+        self.invalidate()
+    
+    def invalidate(self):
+        """Drop cached values so they are read from storage again."""
+        self._theme = None
     
     def sync(self):
         """Ensure settings are written to persistent storage."""
@@ -6,11 +6,72 @@ import os
 import shutil
 from pathlib import Path
 from typing import Optional
-from sqlalchemy import create_engine, text
+import chess
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
-from .models import Base
+from .models import Base, PuzzleTheme
+
+
+# Connection-level settings applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB page cache
+)
+
+
+# Puzzles seeded into an empty database: (fen, solution UCI moves, theme, rating)
+SAMPLE_PUZZLES = (
+    ("r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+     ("h5f7",), PuzzleTheme.MATE, 800),  # Qxf7# - Checkmate in one
+    ("r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 5",
+     ("c4f7", "e8f7", "f3g5", "f7e8", "d1h5"), PuzzleTheme.TACTIC, 1200),  # Bxf7+ Kxf7 Ng5+ Ke8 Qh5+ winning
+    ("r1bqkb1r/pppppppp/2n2n2/8/3PP3/2N5/PPP2PPP/R1BQKBNR b KQkq - 1 3",
+     ("f6e4",), PuzzleTheme.MATERIAL, 1000),  # Nxe4 - Win center pawn
+    ("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4",
+     ("f3g5", "d7d5", "g5f7"), PuzzleTheme.TACTIC, 1400),  # Ng5 d5 Nxf7 winning rook (Fried Liver prep)
+    ("r1bqk2r/pppp1ppp/2n2n2/2b1p3/2BPP3/5N2/PPP2PPP/RNBQK2R b KQkq - 0 5",
+     ("c6d4", "f3d4", "c5d4"), PuzzleTheme.TACTIC, 1500),  # Nd4! Nxd4 Bxd4 winning a pawn
+    ("r2qk2r/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/3P1N2/PPP2PPP/RN1QK2R w KQkq - 0 7",
+     ("c4f7", "e8f7", "f3e5"), PuzzleTheme.MATERIAL, 1600),  # Bxf7+ Kxf7 Ne5+ forking king and queen
+    ("rnbqkb1r/pppp1ppp/5n2/4p3/2B1P3/8/PPPP1PPP/RNBQK1NR w KQkq - 0 3",
+     ("d1f3", "d7d6", "c4f7"), PuzzleTheme.MATE, 700),  # Qf3 d6 Bxf7# - Scholar's mate
+    ("r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+     ("c6d4",), PuzzleTheme.TACTIC, 1300),  # Nd4 - Center fork trick attacking queen and bishop
+)
+
+
+def create_sqlite_engine(db_path: str):
+    """
+    Create a SQLAlchemy engine sharing one tuned SQLite connection.
+    
+    Args:
+        db_path: Path to SQLite database file
+        
+    Returns:
+        SQLAlchemy Engine
+    """
+    engine = create_engine(
+        f'sqlite:///{db_path}',
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=False  # Set to True for SQL debugging
+    )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply SQLITE_PRAGMAS to a freshly opened DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
 
 
 class Database:
@@ -42,12 +103,7 @@ class Database:
         self._migrate_legacy_db_if_needed()
         
         # Create engine
-        self.engine = create_engine(
-            f'sqlite:///{self.db_path}',
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
-            echo=False  # Set to True for SQL debugging
-        )
+        self.engine = create_sqlite_engine(self.db_path)
         
         # Create session factory
         self.SessionLocal = sessionmaker(
@@ -96,10 +152,15 @@ class Database:
             if "opening_variation" not in games_cols:
                 conn.execute(text("ALTER TABLE games ADD COLUMN opening_variation VARCHAR(200)"))
 
-            # Normalize move classification values to enum names (uppercase)
+            # Normalize move classification values to enum names (uppercase).
+            # Only rows that still hold lowercase values are rewritten, so
+            # an up-to-date database is not rewritten on every start.
             moves_cols = _get_table_columns(conn, "moves")
             if "classification" in moves_cols:
-                conn.execute(text("UPDATE moves SET classification = UPPER(classification)"))
+                conn.execute(text(
+                    "UPDATE moves SET classification = UPPER(classification) "
+                    "WHERE classification <> UPPER(classification)"
+                ))
 
             # Add missing practice progress columns
             progress_cols = _get_table_columns(conn, "practice_progress")
@@ -137,89 +198,30 @@ class Database:
         """Create sample puzzles if the database is empty."""
         session = self.get_session()
         try:
+            from .models import Puzzle, PuzzleProgress
+            from datetime import datetime
+            
             # Check if there are any puzzles
-            from .models import Puzzle, PuzzleTheme
             puzzle_count = session.query(Puzzle).count()
             
             if puzzle_count == 0:
                 # Create sample puzzles
-                sample_puzzles = [
-                    {
-                        "fen": "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
-                        "solution": ["h5f7"],
-                        "theme": PuzzleTheme.MATE,
-                        "rating": 800,
-                    },
-                    {
-                        "fen": "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 5",
-                        "solution": ["c4f7", "e8f7", "f3g5", "f7e8", "d1h5"],
-                        "theme": PuzzleTheme.TACTIC,
-                        "rating": 1200,
-                    },
-                    {
-                        "fen": "r1bqkb1r/pppppppp/2n2n2/8/3PP3/2N5/PPP2PPP/R1BQKBNR b KQkq - 1 3",
-                        "solution": ["f6e4"],
-                        "theme": PuzzleTheme.MATERIAL,
-                        "rating": 1000,
-                    },
-                    {
-                        "fen": "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4",
-                        "solution": ["f3g5", "d7d5", "g5f7"],
-                        "theme": PuzzleTheme.TACTIC,
-                        "rating": 1400,
-                    },
-                    {
-                        "fen": "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2BPP3/5N2/PPP2PPP/RNBQK2R b KQkq - 0 5",
-                        "solution": ["c6d4", "f3d4", "c5d4"],
-                        "theme": PuzzleTheme.TACTIC,
-                        "rating": 1500,
-                    },
-                    {
-                        "fen": "r2qk2r/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/3P1N2/PPP2PPP/RN1QK2R w KQkq - 0 7",
-                        "solution": ["c4f7", "e8f7", "f3e5"],
-                        "theme": PuzzleTheme.MATERIAL,
-                        "rating": 1600,
-                    },
-                    {
-                        "fen": "rnbqkb1r/pppp1ppp/5n2/4p3/2B1P3/8/PPPP1PPP/RNBQK1NR w KQkq - 0 3",
-                        "solution": ["d1f3", "d7d6", "c4f7"],
-                        "theme": PuzzleTheme.MATE,
-                        "rating": 700,
-                    },
-                    {
-                        "fen": "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
-                        "solution": ["c6d4"],
-                        "theme": PuzzleTheme.TACTIC,
-                        "rating": 1300,
-                    },
-                ]
-                
-                from .models import PuzzleProgress
-                from datetime import datetime
-                import chess
-                
-                for puzzle_data in sample_puzzles:
+                for fen, solution, theme, rating in SAMPLE_PUZZLES:
                     try:
-                        board = chess.Board(puzzle_data["fen"])
+                        board = chess.Board(fen)
                         side_to_move = "white" if board.turn else "black"
                         
                         puzzle = Puzzle(
-                            fen=puzzle_data["fen"],
+                            fen=fen,
                             side_to_move=side_to_move,
-                            solution_line=puzzle_data["solution"],
-                            theme=puzzle_data["theme"],
-                            rating=puzzle_data["rating"],
+                            solution_line=list(solution),
+                            theme=theme,
+                            rating=rating,
                             source="sample",
                             created_at=datetime.utcnow(),
                         )
+                        puzzle.progress = PuzzleProgress(due_date=datetime.utcnow())
                         session.add(puzzle)
-                        session.flush()
-                        
-                        progress = PuzzleProgress(
-                            puzzle_id=puzzle.id,
-                            due_date=datetime.utcnow(),
-                        )
-                        session.add(progress)
                     except Exception:
                         pass
                 
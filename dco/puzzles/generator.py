@@ -169,11 +169,11 @@ class PuzzleGenerator:
         base_rating = 1500
 
         # Adjustments based on classification
-        if move.classification == MoveClassification.BLUNDER:
+        if move.classification is MoveClassification.BLUNDER:
             base_rating += 300
-        elif move.classification == MoveClassification.CRITICAL:
+        elif move.classification is MoveClassification.CRITICAL:
             base_rating += 200
-        elif move.classification == MoveClassification.MISTAKE:
+        elif move.classification is MoveClassification.MISTAKE:
             base_rating += 100
 
         # Range: 800-2800
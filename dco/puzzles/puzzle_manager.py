@@ -34,31 +34,16 @@ class PuzzleManager:
         """Create a new puzzle."""
         session = self.db.get_session()
         try:
-            board = chess.Board(fen)
-            side_to_move = "white" if board.turn else "black"
-
-            puzzle = Puzzle(
+            puzzle = self.add_puzzle(
+                session,
                 fen=fen,
-                side_to_move=side_to_move,
-                solution_line=solution_moves,
+                solution_moves=solution_moves,
                 theme=theme,
-                theme_tags=theme_tags or [],
                 rating=rating,
                 source=source,
+                theme_tags=theme_tags,
                 source_game_id=source_game_id,
-                created_at=datetime.utcnow(),
-            )
-
-            session.add(puzzle)
-            session.commit()
-            puzzle_id = puzzle.id
-
-            # Create progress tracking record
-            progress = PuzzleProgress(
-                puzzle_id=puzzle_id,
-                due_date=datetime.utcnow(),
             )
-            session.add(progress)
             session.commit()
 
             # Return puzzle data before closing session
@@ -69,6 +54,44 @@ class PuzzleManager:
         finally:
             session.close()
 
+    def add_puzzle(
+        self,
+        session: Session,
+        fen: str,
+        solution_moves: List[str],
+        theme: PuzzleTheme,
+        rating: int,
+        source: str = "manual",
+        theme_tags: Optional[List[str]] = None,
+        source_game_id: Optional[int] = None,
+    ) -> Puzzle:
+        """
+        Add a puzzle and its progress record to an open session.
+
+        Nothing is committed, so callers creating many puzzles can write
+        them all in one transaction.
+        """
+        board = chess.Board(fen)
+        side_to_move = "white" if board.turn else "black"
+        now = datetime.utcnow()
+
+        puzzle = Puzzle(
+            fen=fen,
+            side_to_move=side_to_move,
+            solution_line=solution_moves,
+            theme=theme,
+            theme_tags=theme_tags or [],
+            rating=rating,
+            source=source,
+            source_game_id=source_game_id,
+            created_at=now,
+        )
+        # Progress tracking record, inserted with the puzzle on flush
+        puzzle.progress = PuzzleProgress(due_date=now)
+
+        session.add(puzzle)
+        return puzzle
+
     def get_puzzle(self, puzzle_id: int) -> Optional[Puzzle]:
         """Get a puzzle by ID."""
         session = self.db.get_session()
@@ -3,8 +3,10 @@ Main window for the DCO application.
 Contains the navigation rail and content area.
 """
 
+from typing import Optional
+
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QStackedWidget, QLabel, QFrame
 )
 from PySide6.QtCore import Qt, Signal
@@ -19,6 +21,8 @@ from .screens.play import PlayScreen
 from .screens.puzzles import PuzzleScreen
 from .screens.statistics import StatisticsScreen
 from .screens.settings import SettingsScreen
+from .modern_stylesheet import load_stylesheet
+from ..core.settings import get_settings
 from ..data.db import get_db
 
 
@@ -35,9 +39,16 @@ class NavigationButton(QPushButton):
 class MainWindow(QMainWindow):
     """Main application window with navigation."""
     
-    def __init__(self):
+    def __init__(self, theme: Optional[str] = None):
+        """
+        Initialize the main window.
+        
+        Args:
+            theme: Theme whose stylesheet the application already uses
+        """
         super().__init__()
         self.db = get_db()
+        self._applied_theme = theme
         self.init_ui()
         
     def init_ui(self):
@@ -153,8 +164,28 @@ class MainWindow(QMainWindow):
         
         # Settings screen
         self.settings_screen = SettingsScreen(self.db)
+        self.settings_screen.settings_changed.connect(self._on_settings_changed)
         self.content_stack.addWidget(self.settings_screen)
     
+    def apply_theme(self, theme: str):
+        """
+        Switch the application stylesheet to the given theme.
+        
+        Setting a stylesheet repolishes every widget, so nothing is done
+        when the theme is already applied.
+        
+        Args:
+            theme: 'light' or 'dark'
+        """
+        if theme == self._applied_theme:
+            return
+        QApplication.instance().setStyleSheet(load_stylesheet(theme))
+        self._applied_theme = theme
+    
+    def _on_settings_changed(self):
+        """Apply settings that take effect without a restart."""
+        self.apply_theme(get_settings().get_theme())
+    
     def _cleanup_all_resources(self):
         """Clean up all resources (called on app quit)."""
         # Clean up play screen engine and timers
@@ -16,6 +16,10 @@ Color Palette:
 - Text Secondary: #64748b (Muted Slate)
 """
 
+import functools
+import re
+
+
 STYLESHEET = """
 /* =================================================================
    CLEAN LIGHT THEME - DCO Chess Analyst
@@ -139,7 +143,6 @@ QPushButton#successButton:hover {
    ================================================================= */
 
 QLabel {
-    color: #1e293b;
     background-color: transparent;
 }
 
@@ -204,7 +207,6 @@ QLineEdit,
 QTextEdit,
 QPlainTextEdit {
     background-color: #ffffff;
-    color: #1e293b;
     border: 1px solid #e2e8f0;
     border-radius: 8px;
     padding: 10px 12px;
@@ -226,7 +228,6 @@ QLineEdit::placeholder {
 
 QComboBox {
     background-color: #ffffff;
-    color: #1e293b;
     border: 1px solid #e2e8f0;
     border-radius: 8px;
     padding: 8px 12px;
@@ -336,7 +337,6 @@ QScrollBar::add-line:horizontal {
 
 QMenuBar {
     background-color: #ffffff;
-    color: #1e293b;
     border-bottom: 1px solid #e2e8f0;
     padding: 4px;
 }
@@ -348,7 +348,6 @@ QMenuBar::item:selected {
 
 QMenu {
     background-color: #ffffff;
-    color: #1e293b;
     border: 1px solid #e2e8f0;
     border-radius: 8px;
     padding: 4px;
@@ -400,7 +399,6 @@ QTreeWidget,
 QTableWidget,
 QListWidget {
     background-color: #ffffff;
-    color: #1e293b;
     border: 1px solid #e2e8f0;
     border-radius: 8px;
     gridline-color: #f1f5f9;
@@ -498,10 +496,6 @@ QMessageBox {
     background-color: #ffffff;
 }
 
-QMessageBox QLabel {
-    color: #1e293b;
-}
-
 QMessageBox QPushButton {
     min-width: 80px;
     min-height: 36px;
@@ -518,7 +512,6 @@ QFileDialog {
 QSpinBox,
 QDoubleSpinBox {
     background-color: #ffffff;
-    color: #1e293b;
     border: 1px solid #e2e8f0;
     border-radius: 8px;
     padding: 8px 12px;
@@ -539,7 +532,6 @@ QDoubleSpinBox::down-button {
 }
 
 QCheckBox {
-    color: #1e293b;
     spacing: 8px;
 }
 
@@ -611,7 +603,6 @@ QFrame#statCard {
 
 QDockWidget {
     background-color: #ffffff;
-    color: #1e293b;
 }
 
 QDockWidget::title {
@@ -630,15 +621,25 @@ QDockWidget::title {
 }
 """
 
-def load_stylesheet() -> str:
-    """Load and return the DCO clean light stylesheet."""
-    return STYLESHEET
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_WHITESPACE_RE = re.compile(r"\s+")
+_CSS_PUNCTUATION_RE = re.compile(r"\s*([{};])\s*")
+
 
+def _minify(css: str) -> str:
+    """Strip comments and redundant whitespace so Qt parses fewer tokens."""
+    css = _CSS_COMMENT_RE.sub("", css)
+    css = _CSS_WHITESPACE_RE.sub(" ", css)
+    return _CSS_PUNCTUATION_RE.sub(r"\1", css).strip()
 
+
+@functools.lru_cache(maxsize=4)
 def load_stylesheet(theme: str = "light") -> str:
     """
     Load the appropriate stylesheet based on theme.
     
+    The minified sheet is cached per theme, so repeated loads are free.
+    
     Args:
         theme: "light" or "dark"
     
@@ -646,8 +647,8 @@ def load_stylesheet(theme: str = "light") -> str:
         CSS stylesheet string
     """
     if theme == "dark":
-        return DARK_STYLESHEET
-    return STYLESHEET
+        return _minify(DARK_STYLESHEET)
+    return _minify(STYLESHEET)
 
 
 DARK_STYLESHEET = """
@@ -755,7 +756,6 @@ QLineEdit, QTextEdit, QPlainTextEdit {
     border: 1px solid #334155;
     border-radius: 6px;
     padding: 8px 12px;
-    color: #e2e8f0;
 }
 
 QLineEdit:focus, QTextEdit:focus, QPlainTextEdit:focus {
@@ -772,7 +772,6 @@ QComboBox {
     border: 1px solid #334155;
     border-radius: 6px;
     padding: 8px 12px;
-    color: #e2e8f0;
 }
 
 QComboBox:hover {
@@ -811,7 +810,6 @@ QSpinBox, QDoubleSpinBox {
     border: 1px solid #334155;
     border-radius: 6px;
     padding: 8px 12px;
-    color: #e2e8f0;
 }
 
 QSpinBox:focus, QDoubleSpinBox:focus {
@@ -823,7 +821,6 @@ QSpinBox:focus, QDoubleSpinBox:focus {
    ================================================================= */
 
 QCheckBox, QRadioButton {
-    color: #e2e8f0;
     spacing: 8px;
 }
 
@@ -876,7 +873,6 @@ QHeaderView::section {
    ================================================================= */
 
 QLabel {
-    color: #e2e8f0;
     background-color: transparent;
 }
 
@@ -895,7 +891,6 @@ QGroupBox {
     border-radius: 6px;
     margin-top: 12px;
     padding-top: 12px;
-    color: #e2e8f0;
     font-weight: 500;
 }
 
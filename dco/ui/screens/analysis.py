@@ -13,7 +13,7 @@ import io
 
 from ...data.db import Database
 from ...data.models import Game, Analysis as AnalysisModel, Move
-from ...core.engine import ChessEngine, EngineConfig
+from ...core.engine import EngineConfig, EnginePool
 from ...core.analysis import GameAnalyzer, save_analysis_to_db
 from ...core.practice import generate_practice_items
 from ..widgets.chessboard import ChessboardWidget
@@ -44,7 +44,9 @@ class AnalysisWorker(QThread):
                 depth=20,
                 time_per_move=0.5
             )
-            engine = ChessEngine(config)
+            # One single-threaded engine per core searches the game's
+            # positions side by side
+            engine = EnginePool(config)
             engine.start()
             
             self.progress.emit(f"Analyzing game: {self.game.white} vs {self.game.black}")
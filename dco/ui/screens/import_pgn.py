@@ -22,21 +22,35 @@ class ImportWorker(QThread):
     
     finished = Signal(int, list)  # (count, errors)
     
-    def __init__(self, db: Database, pgn_text: str, skip_duplicates: bool):
+    def __init__(
+        self,
+        db: Database,
+        pgn_text: str,
+        skip_duplicates: bool,
+        file_path: str | None = None
+    ):
         super().__init__()
         self.db = db
         self.pgn_text = pgn_text
         self.skip_duplicates = skip_duplicates
+        self.file_path = file_path
     
     def run(self):
         """Run the import in a background thread."""
         session = self.db.get_session()
         try:
             importer = PGNImporter(session)
-            imported, errors = importer.import_pgn_text(
-                self.pgn_text, 
-                self.skip_duplicates
-            )
+            if self.file_path:
+                # Stream the file itself rather than the text box copy
+                imported, errors = importer.import_pgn_file(
+                    self.file_path,
+                    self.skip_duplicates
+                )
+            else:
+                imported, errors = importer.import_pgn_text(
+                    self.pgn_text, 
+                    self.skip_duplicates
+                )
             self.finished.emit(len(imported), errors)
         except Exception as e:
             self.finished.emit(0, [str(e)])
@@ -101,6 +115,7 @@ class ImportScreen(QWidget):
         self.db = db
         self.import_worker = None
         self.chesscom_worker = None
+        self.pgn_file_path = None  # File shown unedited in the text area
         self.init_ui()
     
     def init_ui(self):
@@ -214,6 +229,7 @@ class ImportScreen(QWidget):
         )
         # Styled by global stylesheet - using monospace font
         self.pgn_text.setStyleSheet("font-family: monospace;")
+        self.pgn_text.textChanged.connect(self._on_pgn_text_changed)
         layout.addWidget(self.pgn_text, 1)  # Stretch to fill space
         
         # Progress bar
@@ -267,6 +283,7 @@ class ImportScreen(QWidget):
                 with open(file_path, 'r', encoding='utf-8') as f:
                     pgn_text = f.read()
                 self.pgn_text.setPlainText(pgn_text)
+                self.pgn_file_path = file_path
             except Exception as e:
                 QMessageBox.critical(
                     self,
@@ -274,6 +291,10 @@ class ImportScreen(QWidget):
                     f"Failed to read file: {str(e)}"
                 )
     
+    def _on_pgn_text_changed(self):
+        """Import the text area contents once they differ from the file."""
+        self.pgn_file_path = None
+    
     def _on_clear(self):
         """Handle clear button click."""
         self.pgn_text.clear()
@@ -297,7 +318,8 @@ class ImportScreen(QWidget):
         self.import_worker = ImportWorker(
             self.db,
             pgn_text,
-            self.skip_duplicates_cb.isChecked()
+            self.skip_duplicates_cb.isChecked(),
+            file_path=self.pgn_file_path
         )
         self.import_worker.finished.connect(self._on_import_finished)
         self.import_worker.start()
@@ -20,7 +20,7 @@ from sqlalchemy import or_, desc
 from ...data.db import Database
 from ...data.models import Game, Analysis
 from ...core.engine import ChessEngine, EngineConfig
-from ...core.analysis import GameAnalyzer, save_analysis_to_db
+from ...core.analysis import analyze_games_parallel, save_analysis_to_db
 from ...core.practice import generate_practice_items
 
 
@@ -37,7 +37,7 @@ class BatchAnalysisWorker(QThread):
         self.depth = depth
 
     def run(self):
-        """Analyze games sequentially in a background thread."""
+        """Analyze games in worker processes from a background thread."""
         analyzed_count = 0
         errors: List[str] = []
         total = len(self.game_ids)
@@ -58,23 +58,34 @@ class BatchAnalysisWorker(QThread):
                 depth=self.depth,
                 time_per_move=0.5
             )
+            # This engine fails fast if Stockfish is missing and scores
+            # practice items; the games themselves are analysed by workers
             engine = ChessEngine(config)
             engine.start()
-            analyzer = GameAnalyzer(engine)
 
-            for idx, game_id in enumerate(self.game_ids, start=1):
-                # Create a fresh session for this game to avoid threading issues
+            done = 0
+            session = self.db.get_session()
+            try:
+                games = session.query(Game).filter(Game.id.in_(self.game_ids)).all()
+            finally:
+                session.close()
+
+            found_ids = {game.id for game in games}
+            for game_id in self.game_ids:
+                if game_id not in found_ids:
+                    errors.append(f"Game id {game_id} not found.")
+                    done += 1
+                    self.progress.emit(done, total, game_id)
+
+            results = analyze_games_parallel(games, engine.config, depth=self.depth)
+            for game_id, result, error in results:
+                # Results are saved here so only this thread touches the database
                 session = self.db.get_session()
                 
                 try:
+                    if error is not None:
+                        raise RuntimeError(error)
                     game = session.query(Game).filter(Game.id == game_id).first()
-                    if not game:
-                        errors.append(f"Game id {game_id} not found.")
-                        self.progress.emit(idx, total, game_id)
-                        continue
-
-                    # Analyze the game
-                    result = analyzer.analyze_game(game, depth=self.depth)
                     
                     # Save to database
                     save_analysis_to_db(session, game, result)
@@ -87,7 +98,8 @@ class BatchAnalysisWorker(QThread):
                     errors.append(f"Game {game_id}: {str(exc)}")
                 finally:
                     session.close()
-                    self.progress.emit(idx, total, game_id)
+                    done += 1
+                    self.progress.emit(done, total, game_id)
 
             self.finished.emit(analyzed_count, errors)
         except RuntimeError as stock_exc:
@@ -679,7 +679,7 @@ class SettingsScreen(QWidget):
         
         # Show confirmation
         message = "Your settings have been saved successfully."
-        message += "\n\nTheme and board color changes will take effect when you restart the application or open a new board."
+        message += "\n\nBoard color changes will take effect when you open a new board."
         
         QMessageBox.information(
             self,
@@ -708,6 +708,8 @@ class SettingsScreen(QWidget):
                 "Settings Reset",
                 "All settings have been reset to default values."
             )
+            
+            self.settings_changed.emit()
     
     def _on_restart(self):
         """Restart the application to apply settings changes."""
@@ -26,12 +26,13 @@ a = Analysis(
         'PySide6.QtCore',
         'PySide6.QtGui', 
         'PySide6.QtWidgets',
+        'PySide6.QtNetwork',
         'shiboken6',
     ] + pyside6_hiddenimports + chess_hiddenimports + sqlalchemy_hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=['matplotlib', 'numpy', 'pandas'],  # Exclude heavy unused packages
+    excludes=['matplotlib', 'pandas'],  # Exclude heavy unused packages
     noarchive=False,
     optimize=0,
 )
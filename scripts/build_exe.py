@@ -21,9 +21,11 @@ args = [
     '--hidden-import=PySide6.QtCore',
     '--hidden-import=PySide6.QtGui',
     '--hidden-import=PySide6.QtWidgets',
+    '--hidden-import=PySide6.QtNetwork',
     '--hidden-import=chess',
     '--hidden-import=chess.engine',
     '--hidden-import=chess.pgn',
+    '--hidden-import=numpy',
     '--hidden-import=sqlalchemy',
     '--hidden-import=sqlalchemy.ext.declarative',
     '--collect-all=PySide6',
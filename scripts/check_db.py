@@ -1,23 +1,23 @@
-import sqlite3
+from sqlalchemy import text
 
-conn = sqlite3.connect('dco_data.db')
-cursor = conn.cursor()
+from dco.data.db import Database, create_sqlite_engine
 
-# List tables
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-tables = cursor.fetchall()
-print("Tables in database:")
-for t in tables:
-    print(f"  - {t[0]}")
+engine = create_sqlite_engine(Database().db_path)
 
-# Check puzzles table structure
-if ('puzzles',) in tables:
-    print("\nPuzzles table structure:")
-    cursor.execute("PRAGMA table_info(puzzles)")
-    columns = cursor.fetchall()
-    for col in columns:
-        print(f"  {col[1]}: {col[2]}")
-else:
-    print("\nNo puzzles table found")
+with engine.connect() as conn:
+    # List tables
+    tables = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'")).fetchall()
+    print("Tables in database:")
+    for t in tables:
+        print(f"  - {t[0]}")
 
-conn.close()
+    # Check puzzles table structure
+    if ('puzzles',) in tables:
+        print("\nPuzzles table structure:")
+        columns = conn.execute(text("PRAGMA table_info(puzzles)")).fetchall()
+        for col in columns:
+            print(f"  {col[1]}: {col[2]}")
+    else:
+        print("\nNo puzzles table found")
+
+engine.dispose()
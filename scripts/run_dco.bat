@@ -24,6 +24,8 @@ if errorlevel 1 (
         pause
         exit /b 1
     )
+    REM Precompile the package so the first launch skips source compilation
+    python -m compileall -q dco >nul 2>&1
 )
 
 REM Run the application
@@ -0,0 +1,104 @@
+"""
+Tests for accuracy and centipawn loss computation.
+Run with: pytest tests/test_accuracy.py
+"""
+
+import math
+
+import pytest
+
+from dco.core import accuracy
+from dco.core.accuracy import (
+    compute_accuracy,
+    compute_average_cp_loss,
+    count_move_types,
+    _cp_loss_to_score,
+)
+from dco.core.analysis import MoveAnalysis
+from dco.core.classification import MoveClassification
+
+
+def _move(ply_index, eval_before, eval_after, is_book=False,
+          classification=MoveClassification.GOOD):
+    """Build a minimal MoveAnalysis for accuracy tests."""
+    return MoveAnalysis(
+        ply_index=ply_index,
+        san="e4",
+        uci="e2e4",
+        fen_before="",
+        fen_after="",
+        eval_before_cp=eval_before,
+        eval_best_cp=eval_before,
+        eval_after_cp=eval_after,
+        best_uci=None,
+        classification=classification,
+        is_book=is_book,
+        is_critical=False,
+        is_brilliant=False,
+    )
+
+
+def test_cp_loss_to_score_matches_decay_curve():
+    """Test that the score curve matches the logarithmic formula."""
+    assert _cp_loss_to_score(0) == 100.0
+    for cp_loss in (1, 50, 100, 500, 2000):
+        expected = max(0.0, 100.0 - 28.85 * math.log10(1 + cp_loss))
+        assert _cp_loss_to_score(cp_loss) == pytest.approx(expected)
+    assert _cp_loss_to_score(100000) == 0.0
+
+
+def test_compute_accuracy_uses_mover_perspective():
+    """Test that losses are measured from the side that moved."""
+    moves = [
+        _move(0, 50, 50),     # White, no loss
+        _move(1, 50, 150),    # Black, 100 cp loss
+        _move(2, 150, 150),   # White, no loss
+        _move(3, 150, 100),   # Black gained, no loss
+    ]
+    expected = round((300.0 + _cp_loss_to_score(100)) / 4, 2)
+    assert compute_accuracy(moves) == expected
+    assert compute_average_cp_loss(moves) == 25.0
+
+
+def test_compute_accuracy_skips_book_and_missing_evals():
+    """Test that book moves are excluded and missing evals count as no loss."""
+    moves = [
+        _move(0, 0, -300, is_book=True),
+        _move(2, None, -300),
+        _move(4, 20, None),
+    ]
+    assert compute_accuracy(moves) == 100.0
+    assert compute_average_cp_loss(moves) == 0.0
+    assert compute_accuracy([_move(0, 0, -300, is_book=True)]) == 100.0
+    assert compute_accuracy([]) == 0.0
+
+
+def test_numba_kernel_matches_numpy(monkeypatch):
+    """Test that the optional Numba kernel agrees with the NumPy path."""
+    if accuracy.accuracy_kernel is None:
+        pytest.skip("numba not installed")
+    moves = [_move(i, (i * 37) % 500 - 250, (i * 91) % 700 - 350) for i in range(40)]
+    moves.append(_move(40, 0, 100000))
+    moves.append(_move(41, None, 0))
+    with_kernel = accuracy._accuracy_stats(moves)
+    monkeypatch.setattr(accuracy, "accuracy_kernel", None)
+    without_kernel = accuracy._accuracy_stats(moves)
+    assert with_kernel == pytest.approx(without_kernel)
+
+
+def test_count_move_types():
+    """Test counting moves per classification."""
+    moves = [
+        _move(0, 0, 0, classification=MoveClassification.BLUNDER),
+        _move(1, 0, 0, classification=MoveClassification.BLUNDER),
+        _move(2, 0, 0, classification=MoveClassification.BEST),
+    ]
+    counts = count_move_types(moves)
+    assert counts[MoveClassification.BLUNDER] == 2
+    assert counts[MoveClassification.BEST] == 1
+    assert counts[MoveClassification.BOOK] == 0
+    assert set(counts) == set(MoveClassification)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,543 @@
+"""
+Tests for game analysis using a deterministic stand-in for Stockfish.
+Run with: pytest tests/test_analysis.py
+"""
+
+import io
+import os
+import struct
+import sys
+from dataclasses import replace
+
+import pytest
+import chess
+import chess.polyglot
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from dco.core.analysis import (
+    GameAnalyzer, analyze_games_parallel, read_mainline, save_analysis_to_db,
+    FIFTY_MOVE_HISTORY_CLOCK, _history_dependent, _zobrist_after,
+)
+from dco.core.classification import CRITICAL_MULTIPV
+from dco.core.engine import (
+    MAX_IDLE_PROCESSES, ChessEngine, EngineConfig, EngineEvaluation, EnginePool,
+    elo_to_skill_level, skill_level_to_elo,
+)
+from dco.data.models import Base, Game, GameSource, Analysis, Move, GameAnalytics
+
+
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300,
+                chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+
+SAMPLE_PGN = """[Event "Test"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+"""
+
+
+class FakeEngine:
+    """Scores positions by material and picks the first legal move by UCI."""
+
+    def __init__(self):
+        self.config = EngineConfig(path="fake", depth=10, multipv=1)
+        self.calls = 0
+        self.batched_positions = 0
+        self.stack_sizes = []
+
+    def new_game(self):
+        pass
+
+    def evaluate(self, board, depth=None, time_limit=None):
+        self.calls += 1
+        self.stack_sizes.append(len(board.move_stack))
+        score = sum(
+            PIECE_VALUES[p.piece_type] * (1 if p.color == chess.WHITE else -1)
+            for p in board.piece_map().values()
+        )
+        legal = sorted(board.legal_moves, key=lambda m: m.uci())
+        best = legal[0] if legal else None
+        return EngineEvaluation(
+            score_cp=score,
+            score_mate=None,
+            best_move=best,
+            pv_lines=[[best]] if best else [],
+            depth=depth or self.config.depth,
+        )
+
+    def evaluate_positions(self, boards, depth=None, time_limit=None):
+        evaluations = [self.evaluate(board, depth, time_limit) for board in boards]
+        self.batched_positions += len(evaluations)
+        return evaluations
+
+
+def _game(pgn_text=SAMPLE_PGN):
+    return Game(source=GameSource.PGN_IMPORT, pgn_text=pgn_text,
+                white_elo=1500, black_elo=1500)
+
+
+def test_analyze_game_links_consecutive_plies():
+    """Test that each ply starts from the position the previous ply reached."""
+    result = GameAnalyzer(FakeEngine()).analyze_game(_game(), depth=10, opening_book_plies=2)
+
+    assert [m.san for m in result.moves] == ["e4", "e5", "Bc4", "Nc6", "Qh5", "Nf6", "Qxf7#"]
+    assert [m.ply_index for m in result.moves] == list(range(7))
+    for prev, nxt in zip(result.moves, result.moves[1:]):
+        assert prev.fen_after == nxt.fen_before
+        assert prev.eval_after_cp == nxt.eval_before_cp
+    assert result.moves[0].fen_before == chess.STARTING_FEN
+    assert result.moves[-1].eval_after_cp == 100  # Black lost the f7 pawn
+
+
+def test_analyze_game_marks_book_plies():
+    """Test that the first opening_book_plies moves are book moves."""
+    result = GameAnalyzer(FakeEngine()).analyze_game(_game(), depth=10, opening_book_plies=4)
+
+    assert [m.is_book for m in result.moves] == [True] * 4 + [False] * 3
+    assert all(m.classification.name == "BOOK" for m in result.moves[:4])
+
+
+def _write_book(path, lines):
+    """Write a Polyglot book containing every move of the given SAN lines."""
+    entries = set()
+    for line in lines:
+        board = chess.Board()
+        for san in line.split():
+            move = board.parse_san(san)
+            raw = (chess.square_file(move.to_square) | chess.square_rank(move.to_square) << 3
+                   | chess.square_file(move.from_square) << 6 | chess.square_rank(move.from_square) << 9)
+            entries.add((chess.polyglot.zobrist_hash(board), raw))
+            board.push(move)
+    path.write_bytes(b"".join(
+        struct.pack(">QHHI", key, raw, 1, 0) for key, raw in sorted(entries)
+    ))
+    return str(path)
+
+
+def test_analyze_game_uses_opening_book(tmp_path):
+    """Test that moves are book moves exactly while the game follows the book."""
+    book = _write_book(tmp_path / "book.bin", ["e4 e5 Nf3 Nc6", "e4 e5 Bc4 Nf6"])
+    analyzer = GameAnalyzer(FakeEngine(), book_path=book)
+
+    result = analyzer.analyze_game(_game(), depth=10, opening_book_plies=6)
+
+    assert [m.is_book for m in result.moves] == [True] * 3 + [False] * 4
+    assert result.moves[3].eval_before_cp is not None
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_analyze_game_leaves_opening_book_closed(tmp_path):
+    """Test that the opening book is neither open nor mapped once a game is analysed."""
+    book = _write_book(tmp_path / "book.bin", ["e4 e5 Nf3 Nc6"])
+    analyzer = GameAnalyzer(FakeEngine(), book_path=book)
+    analyzer.analyze_game(_game(), opening_book_plies=6)
+
+    open_files = {os.path.realpath(f"/proc/self/fd/{fd}") for fd in os.listdir("/proc/self/fd")}
+    with open("/proc/self/maps") as maps:
+        assert book not in open_files and book not in maps.read()
+
+
+def test_analyze_game_skips_engine_for_book_positions():
+    """Test that positions before book plies are not sent to the engine."""
+    result = GameAnalyzer(FakeEngine()).analyze_game(_game(), depth=10, opening_book_plies=4)
+
+    assert all(m.eval_before_cp is None for m in result.moves[:4])
+    assert all(m.best_uci is None for m in result.moves[:4])
+    assert [m.eval_after_cp for m in result.moves[:3]] == [None] * 3
+    assert result.moves[3].eval_after_cp == 0  # Position reached by the last book ply
+    assert all(m.eval_before_cp is not None for m in result.moves[4:])
+
+
+def test_analyze_game_rejects_unparseable_pgn():
+    """Test that an empty PGN raises ValueError."""
+    with pytest.raises(ValueError):
+        GameAnalyzer(FakeEngine()).analyze_game(_game(""))
+
+
+def test_analyze_game_reuses_eval_when_best_move_is_played():
+    """Test that playing the engine's move needs no extra evaluation."""
+    engine = FakeEngine()
+    # Every move is the fake engine's first legal move by UCI
+    result = GameAnalyzer(engine).analyze_game(
+        _game("1. a3 a5 2. Ra2 a4 *"), depth=10, opening_book_plies=0
+    )
+
+    assert engine.batched_positions == 5 + 4  # The game positions, then MultiPV before each move
+    assert all(m.best_uci == m.uci for m in result.moves)
+    assert all(m.eval_best_cp == m.eval_after_cp for m in result.moves)
+
+
+def test_analyze_game_scores_best_move_from_position_before():
+    """Test that a best move that was not played is scored without another search."""
+    engine = FakeEngine()
+    result = GameAnalyzer(engine).analyze_game(_game(), depth=10, opening_book_plies=0)
+
+    assert engine.batched_positions == 8  # Only the game positions
+    for m in result.moves:
+        if m.best_uci != m.uci:
+            assert m.eval_best_cp == m.eval_before_cp
+
+
+def test_zobrist_after_matches_full_hash():
+    """Test that incremental hashes match full hashes through special moves."""
+    board = chess.Board()
+    key = chess.polyglot.zobrist_hash(board)
+    # Castling on both sides, en passant, double pushes and a promotion
+    for san in ("e4 d5 e5 f5 exf6 Nc6 Nf3 Bf5 Bc4 Qd7 O-O O-O-O fxg7 d4 "
+                "gxh8=Q b5 Qxg8 bxc4").split():
+        before = board.copy(stack=False)
+        board.push_san(san)
+        key = _zobrist_after(before, board, key)
+        assert key == chess.polyglot.zobrist_hash(board), san
+
+
+def test_analyze_game_searches_repeated_positions_with_their_history():
+    """Test that a repeated position, and every one after it, is searched with its own history."""
+    engine = FakeEngine()
+    analyzer = GameAnalyzer(engine)
+    analyzer.analyze_game(_game("1. Nf3 Nf6 2. Ng1 Ng8 3. Nf3 Nf6 *"), opening_book_plies=0)
+
+    assert engine.stack_sizes == [0, 1, 2, 3, 4, 5, 6]
+
+    # Nothing after the repetition was cached for the next game
+    analyzer.analyze_game(_game("1. Nf3 Nf6 2. Ng1 Ng8 3. Nf3 Nf6 *"), opening_book_plies=0)
+    assert engine.stack_sizes[7:] == [4, 5, 6]
+
+
+def test_history_dependent_flags_repetitions_and_fifty_move_rule():
+    """Test that positions are flagged from the first repetition and near the fifty-move limit."""
+    board = chess.Board("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1")
+    positions = [board.copy(stack=False)]
+    for uci in ("e1d1", "e8d8", "d1e1", "d8e8", "e2e4", "e8d8"):
+        board.push_uci(uci)
+        positions.append(board.copy(stack=False))
+    keys = [chess.polyglot.zobrist_hash(position) for position in positions]
+
+    assert _history_dependent(positions, keys) == [False, False, False, False, True, False, False]
+
+    board = chess.Board(f"4k3/8/8/8/8/8/4P3/4K3 w - - {FIFTY_MOVE_HISTORY_CLOCK - 1} 80")
+    positions = [board.copy(stack=False)]
+    board.push_uci("e1d1")
+    positions.append(board.copy(stack=False))
+    keys = [chess.polyglot.zobrist_hash(position) for position in positions]
+
+    assert _history_dependent(positions, keys) == [False, True]
+
+
+def test_analyze_game_reuses_evaluations_across_games():
+    """Test that an analyzer evaluates positions seen in an earlier game only once."""
+    cached, uncached = FakeEngine(), FakeEngine()
+    analyzer = GameAnalyzer(cached)
+    first = analyzer.analyze_game(_game(), depth=10, opening_book_plies=0)
+    positions = cached.batched_positions
+    second = analyzer.analyze_game(_game(), depth=10, opening_book_plies=0)
+
+    assert cached.batched_positions == positions
+    assert second.moves == first.moves
+
+    analyzer = GameAnalyzer(uncached, eval_cache_size=0)
+    analyzer.analyze_game(_game(), depth=10, opening_book_plies=0)
+    analyzer.analyze_game(_game(), depth=10, opening_book_plies=0)
+    assert uncached.batched_positions == 2 * positions
+
+
+# Minimal UCI engine: logs every command next to itself and answers each
+# search with the first legal move of the position it was given
+FAKE_UCI_ENGINE = """
+import sys
+import chess
+
+log = open(__file__ + ".log", "a")
+board = chess.Board()
+for line in sys.stdin:
+    line = line.strip()
+    log.write(line + "\\n")
+    log.flush()
+    if line == "uci":
+        print("id name FakeFish")
+        print("option name Threads type spin default 1 min 1 max 8")
+        print("option name Hash type spin default 16 min 1 max 1024")
+        print("option name Skill Level type spin default 20 min 0 max 20")
+        print("uciok")
+    elif line == "isready":
+        print("readyok")
+    elif line.startswith("position"):
+        tokens = line.split()
+        moves = tokens.index("moves") if "moves" in tokens else len(tokens)
+        board = chess.Board() if tokens[1] == "startpos" else chess.Board(" ".join(tokens[2:moves]))
+        for uci in tokens[moves + 1:]:
+            board.push_uci(uci)
+    elif line.startswith("go"):
+        legal = sorted(board.legal_moves, key=lambda m: m.uci())
+        if legal:
+            print(f"info depth 1 score cp 20 pv {legal[0].uci()}")
+            print(f"bestmove {legal[0].uci()}")
+        else:
+            print("info depth 0 score mate 0")
+            print("bestmove (none)")
+    elif line == "quit":
+        break
+    sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def fake_uci_engine(tmp_path):
+    """Path of an executable FAKE_UCI_ENGINE script."""
+    if sys.platform == "win32":
+        pytest.skip("needs an executable script engine")
+    engine_path = tmp_path / "fakefish"
+    engine_path.write_text(f"#!{sys.executable}\n{FAKE_UCI_ENGINE}")
+    engine_path.chmod(0o755)
+    return engine_path
+
+
+def test_analyze_game_sends_ucinewgame_once_per_game(fake_uci_engine):
+    """Test that each analysed game, and only each game, starts with ucinewgame."""
+    engine = ChessEngine(EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1))
+    engine.start()
+    try:
+        analyzer = GameAnalyzer(engine)
+        analyzer.analyze_game(_game(), opening_book_plies=0)
+        engine.evaluate(chess.Board())
+        analyzer.analyze_game(_game("1. a3 a5 2. Ra2 a4 *"), opening_book_plies=0)
+    finally:
+        engine.stop()
+
+    commands = (fake_uci_engine.parent / "fakefish.log").read_text().splitlines()
+    assert commands.count("ucinewgame") == 2
+    assert commands.count("go depth 1") > 2
+
+
+def test_stopped_engine_process_is_reused(fake_uci_engine):
+    """Test that a stopped engine's process serves the next engine with the same settings."""
+    config = EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1)
+    try:
+        for _ in range(3):
+            engine = ChessEngine(replace(config))
+            engine.start()
+            engine.evaluate(chess.Board())
+            engine.stop()
+    finally:
+        ChessEngine.close_pool()
+
+    commands = (fake_uci_engine.parent / "fakefish.log").read_text().splitlines()
+    assert commands.count("uci") == 1
+    assert commands.count("ucinewgame") == 3  # Each session starts with a clear hash
+    assert commands[-1] == "quit"
+
+
+def test_engine_process_pool_keeps_few_idle_processes(fake_uci_engine):
+    """Test that processes stopped beyond MAX_IDLE_PROCESSES are quit rather than kept."""
+    config = EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1)
+    engines = [ChessEngine(replace(config)) for _ in range(MAX_IDLE_PROCESSES + 2)]
+    try:
+        for engine in engines:
+            engine.start()
+        for engine in engines:
+            engine.stop()
+        commands = (fake_uci_engine.parent / "fakefish.log").read_text().splitlines()
+        assert commands.count("quit") == 2
+    finally:
+        ChessEngine.close_pool()
+
+    commands = (fake_uci_engine.parent / "fakefish.log").read_text().splitlines()
+    assert commands.count("quit") == len(engines)
+
+
+def test_play_move_sets_skill_level_only_when_it_changes(fake_uci_engine):
+    """Test that Skill Level is sent once for repeated moves and restored before analysis."""
+    engine = ChessEngine(EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1))
+    engine.start()
+    try:
+        board = chess.Board()
+        for _ in range(3):
+            board.push(engine.play_move(board, skill_level=5, time_limit=0.01))
+        engine.evaluate(board)
+        engine.play_move(board, time_limit=0.01)
+    finally:
+        engine.stop()
+        ChessEngine.close_pool()
+
+    commands = (fake_uci_engine.parent / "fakefish.log").read_text().splitlines()
+    assert [c for c in commands if c.startswith("setoption name Skill Level")] == [
+        "setoption name Skill Level value 5",
+        "setoption name Skill Level value 20",
+    ]
+
+
+def test_analyze_games_parallel_runs_each_game_in_a_worker(fake_uci_engine):
+    """Test that every game comes back from the worker pool."""
+    games = [_game(), _game("1. a3 a5 2. Ra2 a4 *"), _game("")]
+    for game_id, game in enumerate(games, start=1):
+        game.id = game_id
+    config = EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1)
+
+    results = {
+        game_id: (result, error)
+        for game_id, result, error in analyze_games_parallel(
+            games, config, workers=2, opening_book_plies=0, timeout=60
+        )
+    }
+
+    assert len(results[1][0].moves) == 7
+    assert len(results[2][0].moves) == 4
+    assert results[3][0] is None and "PGN" in results[3][1]
+
+
+def test_engine_pool_analysis_matches_single_engine(fake_uci_engine):
+    """Test that an engine pool analyses a game exactly like a single engine."""
+    config = EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1)
+    with ChessEngine(config) as engine:
+        expected = GameAnalyzer(engine).analyze_game(_game(), opening_book_plies=0)
+    with EnginePool(config, size=3) as pool:
+        result = GameAnalyzer(pool).analyze_game(_game(), opening_book_plies=0)
+
+    assert [engine.config.threads for engine in pool.engines] == [1, 1, 1]
+    assert result.moves == expected.moves
+
+
+def test_engine_pool_sends_move_history(fake_uci_engine):
+    """Test that pooled engines get each position with the moves leading to it."""
+    config = EngineConfig(path=str(fake_uci_engine), depth=1, multipv=1)
+    boards = []
+    board = chess.Board()
+    for move in ("e2e4", "e7e5"):
+        board.push_uci(move)
+        boards.append(board.copy())
+    with EnginePool(config, size=2) as pool:
+        pool.evaluate_positions(boards)
+
+    commands = (fake_uci_engine.parent / "fakefish.log").read_text().splitlines()
+    assert "position startpos moves e2e4" in commands
+    assert "position startpos moves e2e4 e7e5" in commands
+
+
+def test_read_mainline_skips_variations_and_comments():
+    """Test that only mainline moves end up on the move stack."""
+    pgn = "1. e4 (1. d4 d5) e5 {main} 2. Nf3 Nc6 (2... d6 3. d4) 3. Bb5 1-0"
+    board = read_mainline(io.StringIO(pgn))
+
+    assert [m.uci() for m in board.move_stack] == ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"]
+    assert board.root() == chess.Board()
+    assert read_mainline(io.StringIO("")) is None
+
+
+def test_save_analysis_to_db_replaces_previous_analysis():
+    """Test that saving twice leaves exactly one analysis and one row per ply."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    game = _game()
+    session.add(game)
+    session.commit()
+
+    analyzer = GameAnalyzer(FakeEngine())
+    for _ in range(2):
+        result = analyzer.analyze_game(game, depth=10, opening_book_plies=2)
+        save_analysis_to_db(session, game, result)
+
+    assert session.query(Analysis).filter(Analysis.game_id == game.id).count() == 1
+    assert session.query(GameAnalytics).filter(GameAnalytics.game_id == game.id).count() == 1
+
+    rows = session.query(Move).filter(Move.game_id == game.id).order_by(Move.ply_index).all()
+    assert [row.san for row in rows] == [m.san for m in result.moves]
+    assert [row.player_color for row in rows[:2]] == ["white", "black"]
+    assert rows[-1].classification.name == result.moves[-1].classification.name
+    assert rows[-1].fen_after == result.moves[-1].fen_after
+    assert [row.cpl for row in rows] == [m.cpl for m in result.moves]
+
+    session.close()
+
+
+def test_save_analysis_to_db_caches_game_analytics():
+    """Test that the cached analytics agree with the analysed moves."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    game = _game()
+    session.add(game)
+    session.commit()
+
+    result = GameAnalyzer(FakeEngine()).analyze_game(game, depth=10, opening_book_plies=2)
+    save_analysis_to_db(session, game, result)
+    analytics = session.query(GameAnalytics).filter(GameAnalytics.game_id == game.id).one()
+
+    scored = [m for m in result.moves if not m.is_book]
+    assert analytics.cpl_distribution["total"] == len(scored)
+    assert sum(analytics.cpl_distribution.values()) == 2 * len(scored)
+    assert analytics.phase_error_counts["opening"]["total_moves"] == len(result.moves)
+    assert analytics.phase_error_counts["endgame"]["total_moves"] == 0
+    assert analytics.blunders_white == sum(
+        m.classification.name == "BLUNDER" for m in result.moves[::2]
+    )
+    assert analytics.acpl_overall == analytics.acpl_opening
+
+    session.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+def test_critical_checks_run_as_one_multipv_batch():
+    """Test that best moves are checked for criticality in one MultiPV batch, not one search each."""
+    class RecordingEngine(FakeEngine):
+        def __init__(self):
+            super().__init__()
+            self.batch_multipv = []
+
+        def evaluate_positions(self, boards, depth=None, time_limit=None):
+            self.batch_multipv.append(self.config.multipv)
+            return super().evaluate_positions(boards, depth, time_limit)
+
+    # Every move is the fake engine's choice: the first legal move by UCI
+    board = chess.Board()
+    for _ in range(6):
+        board.push(min(board.legal_moves, key=lambda m: m.uci()))
+    engine = RecordingEngine()
+
+    result = GameAnalyzer(engine).analyze_game(
+        _game(chess.Board().variation_san(board.move_stack)), depth=10, opening_book_plies=0
+    )
+
+    assert all(m.best_uci == m.uci for m in result.moves)
+    assert engine.batch_multipv == [1, CRITICAL_MULTIPV]
+    assert engine.calls == engine.batched_positions
+    assert engine.config.multipv == 1
+
+
+def test_elo_and_skill_level_conversions_accept_floats():
+    """Test that float Elo ratings and skill levels convert like the truncated integers."""
+    assert elo_to_skill_level(1109.9) == elo_to_skill_level(1109) == 0
+    assert elo_to_skill_level(2100.5) == 10
+    assert elo_to_skill_level(-50.0) == 0 and elo_to_skill_level(9999.0) == 20
+    assert skill_level_to_elo(10.0) == skill_level_to_elo(10) == 2100
+    assert skill_level_to_elo(25.5) == 3200
+
+
+def test_stockfish_discovery_runs_once_per_process(monkeypatch):
+    """Test that engines after the first reuse the discovered Stockfish path."""
+    from dco.core import engine as engine_module
+
+    lookups = []
+    monkeypatch.setattr(engine_module.shutil, "which", lambda name: lookups.append(name) or "/opt/sf")
+    engine_module._discover_stockfish_path.cache_clear()
+    try:
+        assert ChessEngine().config.path == "/opt/sf"
+        assert ChessEngine().config.path == "/opt/sf"
+        assert len(lookups) == 1
+
+        monkeypatch.setattr(engine_module.shutil, "which", lambda name: lookups.append(name))
+        monkeypatch.setattr(engine_module.os.path, "exists", lambda path: False)
+        engine_module._discover_stockfish_path.cache_clear()
+        assert ChessEngine().config.path is None
+        assert ChessEngine().config.path is None
+        assert len(lookups) == 1 + 2 * 4  # A failed search looks up every name again
+    finally:
+        engine_module._discover_stockfish_path.cache_clear()
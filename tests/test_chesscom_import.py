@@ -0,0 +1,185 @@
+"""
+Tests for the Chess.com archive import against a local HTTP server.
+Run with: pytest tests/test_chesscom_import.py
+"""
+
+import gzip
+import json
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dco.core import chesscom_import
+from dco.core.chesscom_import import fetch_chesscom_pgns
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    """Serves monthly archives, gzip-compressed when the client accepts it."""
+
+    protocol_version = "HTTP/1.1"
+    months = 2
+    rate_limited = set()
+    extra_games = []
+    current_month = False
+    requests = []
+
+    def do_GET(self):
+        # Requests sent through a proxy carry the absolute URL
+        self.path = urllib.parse.urlsplit(self.path).path
+        self.requests.append(self.path)
+        base = f"http://{self.headers['Host']}"
+        if self.path.startswith("/moved/"):
+            self.send_response(301)
+            self.send_header("Location", self.path.replace("/moved/", "/player/", 1))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        elif self.path.startswith("/player/") and self.path.endswith("/games/archives"):
+            data = {"archives": [
+                f"{base}/games/2024/{month:02d}" for month in range(1, self.months + 1)
+            ]}
+            if self.current_month:
+                data["archives"].append(f"{base}/games/{datetime.now(timezone.utc):%Y/%m}")
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        elif self.path in self.rate_limited:
+            self.rate_limited.discard(self.path)
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        elif self.path.startswith("/games/"):
+            month = self.path.rsplit("/", 1)[-1]
+            data = {"games": [
+                {"pgn": f"[Event \"{month}\"]\n\n1. e4 *", "rated": True, "time_class": "blitz"},
+                *self.extra_games
+            ]}
+        else:
+            self.send_error(404)
+            return
+
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def archive_server(monkeypatch, tmp_path):
+    """Base URL of a local server standing in for the Chess.com API."""
+    monkeypatch.setattr(chesscom_import, "CACHE_DIR", str(tmp_path / "cache"))
+    _ArchiveHandler.months = 2
+    _ArchiveHandler.rate_limited = set()
+    _ArchiveHandler.extra_games = []
+    _ArchiveHandler.current_month = False
+    _ArchiveHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ArchiveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(chesscom_import, "BASE_URL", f"{base}/player")
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_chesscom_pgns_keeps_archive_order(archive_server):
+    """Test that months fetched side by side come back in archive order."""
+    _ArchiveHandler.months = 12
+
+    pgns, errors = fetch_chesscom_pgns("Someone", None, None)
+
+    assert errors == []
+    assert pgns == [f'[Event "{month:02d}"]\n\n1. e4 *' for month in range(1, 13)]
+
+
+def test_fetch_chesscom_pgns_follows_redirects(archive_server, monkeypatch):
+    """Test that a redirected archive list is fetched from its new location."""
+    monkeypatch.setattr(chesscom_import, "BASE_URL", f"{archive_server}/moved")
+
+    pgns, errors = fetch_chesscom_pgns("someone", None, None)
+
+    assert errors == []
+    assert len(pgns) == 2
+    assert _ArchiveHandler.requests[:2] == [
+        "/moved/someone/games/archives", "/player/someone/games/archives"
+    ]
+
+
+def test_fetch_chesscom_pgns_uses_http_proxy(archive_server, monkeypatch):
+    """Test that requests go through the proxy named by HTTP_PROXY."""
+    for name in ("no_proxy", "NO_PROXY", "http_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", archive_server)
+    monkeypatch.setattr(chesscom_import, "BASE_URL", "http://chess.invalid/player")
+
+    pgns, errors = fetch_chesscom_pgns("someone", None, None)
+
+    assert errors == []
+    assert pgns == ['[Event "01"]\n\n1. e4 *', '[Event "02"]\n\n1. e4 *']
+
+
+def test_fetch_chesscom_pgns_retries_rate_limited_months(archive_server):
+    """Test that a month answered with 429 is fetched again."""
+    _ArchiveHandler.rate_limited = {"/games/2024/02"}
+
+    pgns, errors = fetch_chesscom_pgns("someone", None, None)
+
+    assert errors == []
+    assert pgns == ['[Event "01"]\n\n1. e4 *', '[Event "02"]\n\n1. e4 *']
+
+
+def test_fetch_chesscom_pgns_filters_games(archive_server):
+    """Test that only games matching every filter are returned."""
+    _ArchiveHandler.extra_games = [
+        {"pgn": "1. d4 *", "rated": False, "time_class": "blitz"},
+        {"pgn": "1. c4 *", "rated": True, "time_class": "bullet"},
+        {"rated": True, "time_class": "blitz"},
+    ]
+
+    pgns, errors = fetch_chesscom_pgns("someone", None, None, rated_only=True, time_class="blitz")
+
+    assert errors == []
+    assert pgns == ['[Event "01"]\n\n1. e4 *', '[Event "02"]\n\n1. e4 *']
+
+
+def test_fetch_chesscom_pgns_caches_finished_months(archive_server):
+    """Test that finished months come from the cache and the current one is revalidated."""
+    _ArchiveHandler.current_month = True
+    first, _ = fetch_chesscom_pgns("someone", None, None)
+    _ArchiveHandler.requests = []
+
+    second, errors = fetch_chesscom_pgns("someone", None, None)
+
+    assert errors == []
+    assert second == first and len(second) == 3
+    assert _ArchiveHandler.requests == [
+        "/player/someone/games/archives",
+        f"/games/{datetime.now(timezone.utc):%Y/%m}",
+    ]
+
+
+def test_fetch_chesscom_pgns_reports_http_errors(archive_server, monkeypatch):
+    """Test that an HTTP error status is reported instead of raised."""
+    monkeypatch.setattr(chesscom_import, "BASE_URL", f"{archive_server}/missing")
+
+    pgns, errors = fetch_chesscom_pgns("someone", None, None)
+
+    assert pgns == []
+    assert errors == [f"HTTP error 404 for {archive_server}/missing/someone/games/archives"]
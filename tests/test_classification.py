@@ -0,0 +1,279 @@
+"""
+Tests for move classification.
+Run with: pytest tests/test_classification.py
+"""
+
+import chess
+
+from dco.core.classification import (
+    CRITICAL_MULTIPV, MoveClassification, _evaluate_cached, _is_recapture, _see, classify_move,
+)
+from dco.core.engine import EngineAnalysisError, EngineConfig, EngineEvaluation
+
+
+class CountingEngine:
+    """Engine stand-in that counts searches and scores every position 0."""
+
+    def __init__(self):
+        self.config = EngineConfig(path="fake", depth=10, multipv=1)
+        self.calls = 0
+
+    def evaluate(self, board, depth=None, time_limit=None):
+        self.calls += 1
+        best = next(iter(board.legal_moves), None)
+        return _evaluation(0, best)
+
+
+def _evaluation(score_cp, best_move=None):
+    return EngineEvaluation(
+        score_cp=score_cp,
+        score_mate=None,
+        best_move=best_move,
+        pv_lines=[[best_move]] if best_move else [],
+        depth=10,
+    )
+
+
+def test_forced_move_is_best_without_engine_searches():
+    """Test that the only legal move is classified BEST without searching."""
+    board = chess.Board("7k/8/8/8/8/8/1r6/K7 w - - 0 1")
+    forced = chess.Move.from_uci("a1b2")
+    assert list(board.legal_moves) == [forced]
+
+    engine = CountingEngine()
+    classification = classify_move(
+        move=forced,
+        eval_before=_evaluation(-500, forced),
+        eval_best=_evaluation(0),
+        eval_user=_evaluation(0),
+        is_book=False,
+        board_before=board,
+        engine=engine,
+    )
+
+    assert classification is MoveClassification.BEST
+    assert engine.calls == 0
+
+
+def test_book_move_is_classified_book():
+    """Test that book moves are BOOK whatever the evaluations say."""
+    board = chess.Board()
+    move = chess.Move.from_uci("e2e4")
+
+    classification = classify_move(
+        move=move,
+        eval_before=_evaluation(None),
+        eval_best=_evaluation(None),
+        eval_user=_evaluation(None),
+        is_book=True,
+        board_before=board,
+        engine=CountingEngine(),
+    )
+
+    assert classification is MoveClassification.BOOK
+
+
+def _classify_excellent(board, move):
+    """Classify a move that loses nothing but is not the engine's first choice."""
+    other = next(m for m in board.legal_moves if m != move)
+    return classify_move(
+        move=move,
+        eval_before=_evaluation(0, other),
+        eval_best=_evaluation(0),
+        eval_user=_evaluation(0),
+        is_book=False,
+        board_before=board,
+        engine=CountingEngine(),
+    )
+
+
+def test_see_plays_out_exchanges_with_cheapest_attackers():
+    """Test that static exchange evaluation counts recaptures and x-rays."""
+    cases = {
+        ("4k3/8/3p4/4n3/3P4/8/8/4K3 w - - 0 1", "d4e5"): 2,  # PxN, PxP
+        ("4k3/8/3p4/4p3/8/5N2/8/4K3 w - - 0 1", "f3e5"): -2,  # NxP, PxN
+        ("3rk3/8/8/3p4/8/8/3R4/3QK3 w - - 0 1", "d2d5"): 1,  # Queen behind the rook
+        ("4k3/2p5/8/8/8/8/8/1Q2K3 w - - 0 1", "b1b6"): -9,  # Quiet move en prise
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6"): 1,  # En passant
+    }
+    for (fen, uci), expected in cases.items():
+        assert _see(chess.Board(fen), chess.Move.from_uci(uci)) == expected
+
+
+def test_sound_sacrifice_is_brilliant():
+    """Test that a move giving up material without losing evaluation is BRILLIANT."""
+    board = chess.Board("4k3/2p5/8/8/8/8/8/1Q2K3 w - - 0 1")
+
+    assert _classify_excellent(board, chess.Move.from_uci("b1b6")) is MoveClassification.BRILLIANT
+    assert _classify_excellent(board, chess.Move.from_uci("b1b3")) is MoveClassification.EXCELLENT
+
+
+def test_verification_searches_are_reused_for_repeated_positions():
+    """Test that classifying a best move again costs no engine searches."""
+    board = chess.Board()
+    move = chess.Move.from_uci("e2e4")
+    engine = CountingEngine()
+
+    def classify():
+        return classify_move(
+            move=move,
+            eval_before=_evaluation(0, move),
+            eval_best=_evaluation(0),
+            eval_user=_evaluation(0),
+            is_book=False,
+            board_before=board,
+            engine=engine,
+        )
+
+    assert classify() is MoveClassification.BEST
+    searches = engine.calls
+    assert searches > 0
+    assert classify() is MoveClassification.BEST
+    assert engine.calls == searches
+
+
+def test_verification_searches_depend_on_the_halfmove_clock():
+    """Test that the same position with another halfmove clock is searched again."""
+    engine = CountingEngine()
+    fresh = chess.Board("4k3/8/8/8/8/8/8/R3K3 w - - 0 40")
+    late = chess.Board("4k3/8/8/8/8/8/8/R3K3 w - - 90 40")
+
+    _evaluate_cached(engine, fresh, 10)
+    _evaluate_cached(engine, fresh, 10)
+    assert engine.calls == 1
+    _evaluate_cached(engine, late, 10)
+    assert engine.calls == 2
+
+
+class MultiPVEngine(CountingEngine):
+    """Engine stand-in whose MultiPV search returns fixed per-line scores."""
+
+    def __init__(self, scores):
+        super().__init__()
+        self.scores = scores
+
+    def evaluate(self, board, depth=None, time_limit=None):
+        self.calls += 1
+        moves = list(board.legal_moves)[:self.config.multipv]
+        scores = self.scores[:len(moves)]
+        return EngineEvaluation(
+            score_cp=scores[0],
+            score_mate=None,
+            best_move=moves[0],
+            pv_lines=[[m] for m in moves],
+            depth=depth or 10,
+            pv_scores=scores,
+        )
+
+
+def test_critical_position_uses_multipv_scores_from_one_search():
+    """Test that critical detection reads candidate scores from a single MultiPV search."""
+    board = chess.Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1")
+    best = next(iter(board.legal_moves))
+    # White's perspective: Black's best line is far ahead of every alternative
+    engine = MultiPVEngine([-300, 0, 50, 100, 400])
+
+    classification = classify_move(
+        move=best,
+        eval_before=_evaluation(-300, best),
+        eval_best=_evaluation(-300),
+        eval_user=_evaluation(-300),
+        is_book=False,
+        board_before=board,
+        engine=engine,
+    )
+
+    assert classification is MoveClassification.CRITICAL
+    assert engine.calls == 1
+    assert engine.config.multipv == 1
+
+
+def test_recapture_is_detected_without_changing_the_board():
+    """Test that _is_recapture spots recaptures and leaves the board as it was."""
+    board = chess.Board()
+    for uci in ("e2e4", "d7d5", "e4d5"):
+        board.push_uci(uci)
+    fen = board.fen()
+
+    assert _is_recapture(chess.Move.from_uci("d8d5"), board)
+    assert not _is_recapture(chess.Move.from_uci("g8f6"), board)
+    assert board.fen() == fen and len(board.move_stack) == 3
+
+    board.push_uci("d8d5")
+    board.push_uci("g1f3")
+    assert not _is_recapture(chess.Move.from_uci("d5f3"), board)  # Last move was no capture
+
+
+def test_missed_mate_is_critical_for_either_side():
+    """Test that missing a forced mate is CRITICAL for Black as well as White."""
+    for fen, mate in ((chess.STARTING_FEN, 3), (chess.STARTING_BOARD_FEN + " b KQkq - 0 1", -3)):
+        board = chess.Board(fen)
+        move, best = list(board.legal_moves)[:2]
+        mating = EngineEvaluation(score_cp=None, score_mate=mate, best_move=None, pv_lines=[], depth=10)
+
+        classification = classify_move(
+            move=move,
+            eval_before=_evaluation(0, best),
+            eval_best=mating,
+            eval_user=_evaluation(0),
+            is_book=False,
+            board_before=board,
+        )
+
+        assert classification is MoveClassification.CRITICAL
+
+
+def test_engine_failure_during_verification_is_not_critical():
+    """Test that an engine failure in the critical check classifies the move BEST and restores MultiPV."""
+    class FailingEngine(CountingEngine):
+        def evaluate(self, board, depth=None, time_limit=None):
+            raise EngineAnalysisError("engine does not support MultiPV")
+
+    board = chess.Board()
+    move = chess.Move.from_uci("e2e4")
+    engine = FailingEngine()
+
+    classification = classify_move(
+        move=move,
+        eval_before=_evaluation(0, move),
+        eval_best=_evaluation(0),
+        eval_user=_evaluation(0),
+        is_book=False,
+        board_before=board,
+        engine=engine,
+    )
+
+    assert classification is MoveClassification.BEST
+    assert engine.config.multipv == 1
+
+
+def test_recapture_after_en_passant_is_detected():
+    """Test that taking back on the square of an en passant capture counts as a recapture."""
+    board = chess.Board("8/4k3/8/3pP3/8/8/8/4K3 w - d6 0 1")
+    board.push_uci("e5d6")
+
+    assert _is_recapture(chess.Move.from_uci("e7d6"), board)
+    assert not _is_recapture(chess.Move.from_uci("e7e6"), board)
+
+
+def test_critical_check_reuses_eval_before_with_enough_lines():
+    """Test that an eval_before with five scored lines needs no MultiPV search."""
+    board = chess.Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1")
+    engine = MultiPVEngine([-300, 0, 50, 100, 400])
+    engine.config.multipv = CRITICAL_MULTIPV
+    eval_before = engine.evaluate(board, depth=10)
+    engine.config.multipv = 1
+    engine.calls = 0
+
+    classification = classify_move(
+        move=eval_before.best_move,
+        eval_before=eval_before,
+        eval_best=_evaluation(-300),
+        eval_user=_evaluation(-300),
+        is_book=False,
+        board_before=board,
+        engine=engine,
+    )
+
+    assert classification is MoveClassification.CRITICAL
+    assert engine.calls == 0
@@ -0,0 +1,43 @@
+"""
+Tests for ECO opening detection.
+Run with: pytest tests/test_eco.py
+"""
+
+import chess
+
+from dco.core.eco import get_eco_detector
+
+
+PHILIDOR = ["e4", "e5", "Nf3", "d6"]
+
+
+def test_detect_opening_san_uses_longest_known_prefix():
+    """Test that moves past the end of an ECO line still match that line."""
+    detector = get_eco_detector()
+
+    assert detector.detect_opening_san(PHILIDOR)[:2] == ("C41", "Philidor Defense")
+    assert detector.detect_opening_san(PHILIDOR + ["d4", "Bg4"]) == detector.detect_opening_san(PHILIDOR)
+    assert detector.detect_opening_san(["h4", "a5"]) == (None, None, None)
+
+
+def test_detect_opening_matches_san_detection():
+    """Test that detecting from a board agrees with detecting from its SAN moves."""
+    board = chess.Board()
+    for san in PHILIDOR + ["d4", "Bg4"]:
+        board.push_san(san)
+
+    detector = get_eco_detector()
+    assert detector.detect_opening(board) == detector.detect_opening_san(PHILIDOR + ["d4", "Bg4"])
+
+
+def test_display_name_is_precomputed_for_detected_openings():
+    """Test that detected openings get their display name from the load-time table."""
+    detector = get_eco_detector()
+    opening = detector.detect_opening_san(PHILIDOR)
+
+    assert detector.get_opening_display_name(*opening) == "C41: Philidor Defense"
+    assert detector._display_names[opening] == "C41: Philidor Defense"
+    assert detector.get_opening_display_name("C50", "Italian Game", "Giuoco Piano") == (
+        "C50: Italian Game, Giuoco Piano"
+    )
+    assert detector.get_opening_display_name(None, "Italian Game", None) == "Italian Game"
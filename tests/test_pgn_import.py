@@ -0,0 +1,139 @@
+"""
+Tests for PGN import.
+Run with: pytest tests/test_pgn_import.py
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from dco.core import pgn_import
+from dco.core.pgn_import import PGNImporter
+from dco.data.models import Base, Game
+
+
+GAME_PGN = """[Event "Casual"]
+[Date "2024.01.02"]
+[White "Alice"]
+[Black "Bob"]
+[WhiteElo "1500"]
+[BlackElo "?"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+"""
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_import_pgn_text_stores_game_fields():
+    """Test that an imported game keeps its headers and SAN moves."""
+    session = _session()
+
+    imported, errors = PGNImporter(session).import_pgn_text(GAME_PGN)
+
+    assert errors == []
+    game = session.query(Game).one()
+    assert imported == [game]
+    assert (game.white, game.black, game.white_elo, game.black_elo) == ("Alice", "Bob", 1500, None)
+    assert game.moves_san == "e4 e5 Bc4 Nc6 Qh5 Nf6 Qxf7#"
+
+
+def test_import_pgn_text_skips_duplicates():
+    """Test that a game already in the database is skipped, and kept when duplicates are allowed."""
+    session = _session()
+    importer = PGNImporter(session)
+    importer.import_pgn_text(GAME_PGN)
+
+    imported, errors = importer.import_pgn_text(GAME_PGN)
+    assert imported == []
+    assert errors == ["Skipped duplicate: Alice vs Bob on 2024.01.02"]
+
+    other_line = GAME_PGN.replace("3. Qh5 Nf6 4. Qxf7#", "3. Qf3 Nf6 4. Qxf7#")
+    assert len(importer.import_pgn_text(other_line)[0]) == 1
+    assert len(importer.import_pgn_text(GAME_PGN, skip_duplicates=False)[0]) == 1
+    assert session.query(Game).count() == 3
+
+
+def test_import_pgn_text_looks_up_duplicates_in_one_query():
+    """Test that duplicates, within the text or already stored, are found with a single SELECT."""
+    session = _session()
+    importer = PGNImporter(session)
+    importer.import_pgn_text(GAME_PGN)
+    other_game = GAME_PGN.replace("Bob", "Carol")
+
+    statements = []
+    event.listen(session.bind, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    imported, errors = importer.import_pgn_text(GAME_PGN + "\n" + other_game + "\n" + other_game)
+
+    assert sum(statement.startswith("SELECT") for statement in statements) == 1
+    assert [game.black for game in imported] == ["Carol"]
+    assert errors == [
+        "Skipped duplicate: Alice vs Bob on 2024.01.02",
+        "Skipped duplicate: Alice vs Carol on 2024.01.02",
+    ]
+
+
+def test_import_pgn_text_inserts_games_in_one_statement():
+    """Test that all imported games are written by one INSERT and returned in PGN order."""
+    session = _session()
+    players = ["Bob", "Carol", "Dave", "Eve"]
+    pgn_text = "\n".join(GAME_PGN.replace("Bob", name) for name in players)
+
+    statements = []
+    event.listen(session.bind, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    imported, errors = PGNImporter(session).import_pgn_text(pgn_text)
+
+    assert sum(statement.startswith("INSERT") for statement in statements) == 1
+    assert errors == []
+    assert [game.black for game in imported] == players
+    assert [game.id for game in imported] == [1, 2, 3, 4]
+
+
+def test_import_pgn_file_commits_in_batches(tmp_path, monkeypatch):
+    """Test that a PGN file is imported batch by batch, still skipping duplicates across batches."""
+    monkeypatch.setattr(pgn_import, "IMPORT_BATCH_SIZE", 2)
+    session = _session()
+    players = ["Bob", "Carol", "Bob", "Dave", "Eve"]
+    path = tmp_path / "games.pgn"
+    path.write_text("\n".join(GAME_PGN.replace("Bob", name) for name in players), encoding="utf-8")
+
+    commits = []
+    event.listen(session, "after_commit", lambda session: commits.append(session))
+    imported, errors = PGNImporter(session).import_pgn_file(str(path))
+
+    assert [game.black for game in imported] == ["Bob", "Carol", "Dave", "Eve"]
+    assert errors == ["Skipped duplicate: Alice vs Bob on 2024.01.02"]
+    assert len(commits) == 3
+
+
+def test_split_pgn_boundaries_ends_chunks_at_games(tmp_path, monkeypatch):
+    """Test that a PGN file is split only where a game starts, covering every byte."""
+    monkeypatch.setattr(pgn_import, "PARSE_CHUNK_SIZE", 10)
+    path = tmp_path / "games.pgn"
+    path.write_bytes(b"\n".join(GAME_PGN.replace("Bob", name).encode() for name in ["Bob", "Carol", "Dave"]))
+
+    chunks = pgn_import._split_pgn_boundaries(str(path))
+
+    data = path.read_bytes()
+    assert [data[offset:offset + length].count(b"[Event ") for _, offset, length in chunks] == [1, 1, 1]
+    assert sum(length for _, _, length in chunks) == len(data)
+
+
+def test_import_pgn_file_parses_chunks_in_worker_processes(tmp_path, monkeypatch):
+    """Test that games parsed by worker processes are saved in file order."""
+    monkeypatch.setattr(pgn_import, "PARSE_CHUNK_SIZE", 10)
+    session = _session()
+    players = ["Bob", "Carol", "Bob", "Dave"]
+    path = tmp_path / "games.pgn"
+    path.write_text("\n".join(GAME_PGN.replace("Bob", name) for name in players), encoding="utf-8")
+
+    imported, errors = PGNImporter(session).import_pgn_file(str(path), workers=2)
+
+    assert [game.black for game in imported] == ["Bob", "Carol", "Dave"]
+    assert errors == ["Skipped duplicate: Alice vs Bob on 2024.01.02"]
@@ -0,0 +1,59 @@
+"""
+Tests for puzzle creation in PuzzleManager.
+Run with: pytest tests/test_puzzle_manager.py
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from dco.data.models import Base, Puzzle, PuzzleProgress, PuzzleTheme
+from dco.puzzles import PuzzleManager
+
+
+MATE_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+FORK_FEN = "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"
+
+
+class _MemoryDatabase:
+    """Minimal stand-in for Database backed by in-memory SQLite."""
+
+    def __init__(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self._sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_session(self):
+        return self._sessions()
+
+
+def test_create_puzzle_adds_progress_record():
+    """Test that create_puzzle stores the puzzle together with its progress record."""
+    db = _MemoryDatabase()
+    PuzzleManager(db).create_puzzle(MATE_FEN, ["h5f7"], PuzzleTheme.MATE, 800)
+
+    session = db.get_session()
+    puzzle = session.query(Puzzle).one()
+    assert puzzle.side_to_move == "white"
+    assert puzzle.progress is not None
+    assert session.query(PuzzleProgress).one().puzzle_id == puzzle.id
+    session.close()
+
+
+def test_add_puzzle_waits_for_caller_commit():
+    """Test that add_puzzle only stages puzzles until the caller commits."""
+    db = _MemoryDatabase()
+    manager = PuzzleManager(db)
+
+    session = db.get_session()
+    manager.add_puzzle(session, MATE_FEN, ["h5f7"], PuzzleTheme.MATE, 800)
+    manager.add_puzzle(session, FORK_FEN, ["c6d4"], PuzzleTheme.TACTIC, 1300)
+    assert db.get_session().query(Puzzle).count() == 0
+
+    session.commit()
+    session.close()
+
+    session = db.get_session()
+    assert session.query(Puzzle).count() == 2
+    assert session.query(PuzzleProgress).count() == 2
+    assert {p.side_to_move for p in session.query(Puzzle)} == {"white", "black"}
+    session.close()